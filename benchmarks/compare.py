@@ -0,0 +1,63 @@
+"""Compare two ``benchmarks.run`` JSON reports and flag regressions.
+
+    python -m benchmarks.compare base.json new.json --threshold 1.25
+
+Exits with status 1 when any timing got slower (or any throughput got
+lower) by more than ``--threshold``.
+"""
+
+import argparse
+import json
+import sys
+
+
+def _metrics(node, prefix=""):
+    """Flatten a report into ``{path: (value, higher_is_better)}``."""
+    if isinstance(node, dict):
+        if "median_ms" in node:
+            yield prefix, (node["median_ms"], False)
+            return
+        for key, value in node.items():
+            yield from _metrics(value, f"{prefix}/{key}" if prefix else key)
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        if prefix.endswith("_per_s"):
+            yield prefix, (node, True)
+        elif prefix.endswith(("_ms", "_s", "_mb")):
+            yield prefix, (node, False)
+
+
+def compare(base, new, threshold):
+    base_metrics = dict(_metrics(base["results"]))
+    regressions = []
+    for path, (value, higher_is_better) in _metrics(new["results"]):
+        if path not in base_metrics or not base_metrics[path][0] or not value:
+            continue
+        old = base_metrics[path][0]
+        ratio = old / value if higher_is_better else value / old
+        marker = "REGRESSION" if ratio > threshold else ""
+        print(f"{path:<60} {old:>12.3f} {value:>12.3f} {ratio:>6.2f}x {marker}")
+        if marker:
+            regressions.append(path)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    print(f"{'metric':<60} {base.get('commit') or 'base':>12} {new.get('commit') or 'new':>12}")
+    regressions = compare(base, new, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.2f}x")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
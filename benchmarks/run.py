@@ -0,0 +1,434 @@
+"""Benchmark suite for pages, models and storage.
+
+Run from the repository root::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --quick --only models history
+    python -m benchmarks.compare base.json bench.json
+
+Sections:
+
+* ``pages``   - full script rerun of every sidebar page (and each Predict
+  click) through Streamlit's ``AppTest``.
+* ``models``  - single-row and batch ``predict`` latency per model, and
+  compiled arrays vs the pickled estimator per batch size (the trade-off
+  behind ``INTELLIHEALTH_COMPILED_MAX_ROWS``).
+* ``history`` - ``save_history`` / ``load_history`` with 1k, 100k and 1M
+  synthetic rows, for every history backend.  ``save_history`` is timed
+  until its write-behind commit completes.
+* ``login``   - user index build and login / signup lookups with 10k and
+  1M users.
+* ``rss``     - peak RSS of a fresh interpreter after loading all models.
+* ``startup`` - import cost of each page in a fresh interpreter
+  (``benchmarks.startup``).
+* ``analytics`` - cohort queries over 1M and 10M synthetic rows in the
+  Parquet analytics store.
+
+Timings are reported like pytest-benchmark (min / median / mean / p95 in
+milliseconds).  Storage benchmarks run in a temporary directory, so no
+real user data is touched.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+SECTIONS = ("pages", "models", "history", "login", "rss", "startup", "analytics")
+
+PREDICT_PAGES = ["Stress Analysis", "Sleep Analysis", "Calorie Analysis"]
+
+
+# --------------------------------------------------
+# TIMING HELPERS
+# --------------------------------------------------
+def timed(fn, repeat=20, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "rounds": repeat,
+    }
+
+
+@contextmanager
+def scratch_dir():
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="intellihealth-bench-") as path:
+        os.chdir(path)
+        try:
+            yield path
+        finally:
+            os.chdir(previous)
+
+
+@contextmanager
+def serving(module, store):
+    """Make ``store`` the one behind ``module``'s public functions."""
+    from intellihealth import writer
+
+    previous = module._store
+    module._store = store
+    try:
+        yield store
+    finally:
+        writer.flush()
+        module._store = previous
+
+
+# --------------------------------------------------
+# PAGES
+# --------------------------------------------------
+def bench_pages(quick):
+    from streamlit.testing.v1 import AppTest
+
+    from intellihealth.ui import PAGES
+
+    repeat = 3 if quick else 10
+    results = {}
+    with scratch_dir():
+        at = AppTest.from_file(APP, default_timeout=300)
+        results["Login"] = timed(at.run, repeat)
+
+        at.session_state["logged_in"] = True
+        at.session_state["username"] = "bench"
+        at.session_state["history_saved"] = True
+        at.session_state["stress"] = 55.0
+        at.session_state["sleep"] = 60.0
+        at.session_state["calories"] = 2200.0
+        at.run()
+
+        for page in PAGES:
+            at.sidebar.radio[0].set_value(page)
+            results[page] = timed(at.run, repeat)
+            if page in PREDICT_PAGES:
+                def click():
+                    at.main.button[0].click()
+                    at.run()
+                results[f"{page} (predict)"] = timed(click, repeat)
+    return results
+
+
+# --------------------------------------------------
+# MODELS
+# --------------------------------------------------
+def bench_models(quick):
+    import pandas as pd
+
+    from intellihealth import inference
+    from intellihealth.forest import CompiledEnsemble
+    from intellihealth.schema import MODEL_NAMES, random_inputs
+
+    batch = 1_000 if quick else 10_000
+    results = {}
+    for name in MODEL_NAMES:
+        start = time.perf_counter()
+        model = inference.get_model(name)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        df = inference.add_derived_features(pd.DataFrame(random_inputs(name, batch)))
+        rows = inference.feature_frame(model, df).to_numpy().tolist()
+        single = rows[0]
+        results[name] = {
+            "estimator": type(model.estimator).__name__,
+            "load_ms": load_ms,
+            # Bypasses the prediction cache on purpose.
+            "single_row": timed(lambda: model.predict_row(single), 20 if quick else 100),
+            f"batch_{batch}": timed(lambda: model.predict_rows(rows), 3 if quick else 10),
+            "explain_row": timed(lambda: model.explain_row(single), 20 if quick else 100),
+            # One what-if panel refresh: 200 rows in one predict.
+            "sweep_sleep_duration": timed(
+                lambda: inference.sweep(name, single, "sleep_duration"), 20 if quick else 100
+            ),
+        }
+        if isinstance(model.estimator, CompiledEnsemble):
+            results[name]["compiled_vs_pickle"] = _compiled_vs_pickle(
+                name, model.estimator, np.asarray(rows), quick
+            )
+    return results
+
+
+def _compiled_vs_pickle(name, compiled, X, quick):
+    import joblib
+
+    from intellihealth import inference
+
+    pickled = joblib.load(inference.artifact_path(f"{name}_model.pkl"))
+    results = {}
+    for n in (1, 100, inference.COMPILED_MAX_ROWS, 1_000, 10_000):
+        if n > len(X) or str(n) in results:
+            continue
+        repeat = 3 if quick or n > 1_000 else 20
+        results[str(n)] = {
+            "compiled": timed(lambda: compiled.predict(X[:n]), repeat),
+            "pickle": timed(lambda: pickled.predict(X[:n]), repeat),
+        }
+    return results
+
+
+# --------------------------------------------------
+# HISTORY STORAGE
+# --------------------------------------------------
+def _synthetic_history(n, users=1000, seed=0):
+    from intellihealth.history import make_row
+
+    rng = np.random.default_rng(seed)
+    stress = rng.uniform(0, 100, n)
+    sleep = rng.uniform(0, 100, n)
+    calories = rng.uniform(1200, 3500, n)
+    return [
+        make_row(f"user{i % users}", stress[i], sleep[i], calories[i], "2025-01-01 00:00")
+        for i in range(n)
+    ]
+
+
+def bench_history(quick):
+    from intellihealth import history
+
+    sizes = [1_000, 100_000] if quick else [1_000, 100_000, 1_000_000]
+    results = {}
+    for backend, cls in history.BACKENDS.items():
+        for n in sizes:
+            with scratch_dir(), serving(history, cls()) as store:
+                rows = _synthetic_history(n)
+                start = time.perf_counter()
+                store.append_many(rows)
+                bulk_s = time.perf_counter() - start
+
+                # The public functions, including the write-behind commit.
+                results[f"{backend}/{n}"] = {
+                    "bulk_insert_rows_per_s": n / bulk_s,
+                    "save_history": timed(
+                        lambda: history.save_history("user1", 50.0, 60.0, 2000.0).result(),
+                        20 if quick else 100,
+                    ),
+                    "load_history_user": timed(
+                        lambda: history.load_history("user1"), 3 if quick else 10
+                    ),
+                    "load_history_all": timed(history.load_history, 1 if quick else 3),
+                    "load_baseline": timed(
+                        lambda: history.load_baseline("user1"), 3 if quick else 10
+                    ),
+                }
+    return results
+
+
+# --------------------------------------------------
+# LOGIN
+# --------------------------------------------------
+def _write_users(path, n):
+    from intellihealth.users import USER_COLUMNS, hash_password
+
+    # One real hash reused for every row; hashing 1M passwords would dominate.
+    stored = hash_password("bench-password")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(",".join(USER_COLUMNS) + "\n")
+        for i in range(n):
+            f.write(f"user{i},{stored}\n")
+
+
+def bench_login(quick):
+    from intellihealth import users
+
+    sizes = [10_000] if quick else [10_000, 1_000_000]
+    results = {}
+    for n in sizes:
+        with scratch_dir():
+            _write_users("users.csv", n)
+            store = users.UserStore("users.csv")
+            start = time.perf_counter()
+            store.refresh()
+            build_ms = (time.perf_counter() - start) * 1000
+            last = f"user{n - 1}"
+            with serving(users, store):
+                results[str(n)] = {
+                    "index_build_ms": build_ms,
+                    "rerun_refresh": timed(store.refresh, 100),
+                    "signup_exists": timed(lambda: users.user_exists("new-user"), 100),
+                    "login_verify": timed(
+                        lambda: users.verify_user(last, "bench-password"), 3 if quick else 10
+                    ),
+                }
+    return results
+
+
+# --------------------------------------------------
+# MEMORY
+# --------------------------------------------------
+_RSS_PROBE = """
+import json, resource, time
+start = time.perf_counter()
+from intellihealth import inference
+from intellihealth.schema import MODEL_NAMES
+for name in MODEL_NAMES:
+    inference.get_model(name)
+print(json.dumps({
+    "load_all_s": time.perf_counter() - start,
+    "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+"""
+
+
+def bench_rss(quick):
+    out = subprocess.run(
+        [sys.executable, "-c", _RSS_PROBE],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+# --------------------------------------------------
+# ANALYTICS
+# --------------------------------------------------
+def _synthetic_analytics(root, rows, users=100_000, months=24, seed=0):
+    import pyarrow as pa
+
+    from intellihealth import analytics
+
+    rng = np.random.default_rng(seed)
+    names = np.array([f"user{i}" for i in range(users)], dtype=object)
+    buckets = np.array([analytics.user_bucket(n) for n in names], dtype=np.int32)
+    month_names = np.array(
+        [f"{2023 + m // 12}-{m % 12 + 1:02d}" for m in range(months)], dtype=object
+    )
+    step = 2_000_000
+    for part, start in enumerate(range(0, rows, step)):
+        n = min(step, rows - start)
+        u = rng.integers(0, users, n)
+        month = month_names[rng.integers(0, months, n)]
+        analytics.write_table(
+            pa.table({
+                "username": pa.array(names[u], pa.string()),
+                "timestamp": pa.array(month + "-01 00:00", pa.string()),
+                "stress": rng.uniform(0, 100, n),
+                "sleep": rng.uniform(0, 100, n),
+                "calories": rng.uniform(1200, 3500, n),
+                "month": pa.array(month, pa.string()),
+                "bucket": buckets[u],
+            }),
+            root,
+            tag=f"bench{part}",
+        )
+    return month_names
+
+
+def bench_analytics(quick):
+    from intellihealth import analytics
+
+    sizes = [1_000_000] if quick else [1_000_000, 10_000_000]
+    results = {}
+    for n in sizes:
+        with scratch_dir() as root:
+            months = _synthetic_analytics(root, n)
+            start = time.perf_counter()
+            analytics.compact(root)
+            compact_s = time.perf_counter() - start
+            window = (months[-3], months[-1])
+            results[str(n)] = {
+                "compact_s": compact_s,
+                "cohort_summary_all": timed(
+                    lambda: analytics.cohort_summary(root=root), 3
+                ),
+                "cohort_summary_3_months": timed(
+                    lambda: analytics.cohort_summary(*window, root=root), 3
+                ),
+                "monthly_means": timed(lambda: analytics.monthly_means(root=root), 3),
+                "single_user_scan": timed(
+                    lambda: analytics.scan(
+                        ["timestamp", "stress"], username="user42", root=root
+                    ),
+                    5,
+                ),
+            }
+    return results
+
+
+def bench_startup(quick):
+    from benchmarks.startup import measure
+    from intellihealth.ui import PAGES
+
+    pages = ["Login", "Home"] if quick else ["Login", *PAGES]
+    return {page: measure(page) for page in pages}
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Benchmark IntelliHealth pages, models and storage.",
+    )
+    parser.add_argument("--only", nargs="+", choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes, fewer rounds")
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    benches = {
+        "pages": bench_pages,
+        "models": bench_models,
+        "history": bench_history,
+        "login": bench_login,
+        "rss": bench_rss,
+        "startup": bench_startup,
+        "analytics": bench_analytics,
+    }
+    report = {
+        "commit": _commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "results": {},
+    }
+    for section in args.only:
+        print(f"running {section}...", file=sys.stderr)
+        report["results"][section] = benches[section](args.quick)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
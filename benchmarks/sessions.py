@@ -0,0 +1,382 @@
+"""Concurrent-session load test for the Streamlit app.
+
+Starts ``streamlit run app.py`` on a free local port in a temporary
+directory.  Simulated sessions then connect to it the way a browser tab
+does.  Each one opens the app websocket, sends ``rerun_script`` messages
+with its widget values and waits for the script to finish.  Every session
+walks through the flow of a new user::
+
+    sign up -> log in -> Stress, Sleep and Calorie predictions ->
+    Visualization Dashboard -> Final Recommendations (saves) -> My Health History
+
+Concurrency is ramped over ``--sessions``.  At each level every session
+runs the flow ``--rounds`` times back to back, each time as a fresh user
+on a new connection; ``--think`` adds a pause between steps.  Reported
+per level:
+
+* completed flows per second;
+* p50 / p95 / p99 latency of each step (a step is one or two reruns);
+* errors (exceptions on a page, or a flow that could not continue);
+* lost writes - signups or saved history rows missing from the files;
+* peak RSS of the server process.
+
+Everything runs on this machine, and the server is started with usage
+statistics disabled.  Exits non-zero on any error or lost write::
+
+    python -m benchmarks.sessions --sessions 1 2 4 8 16
+    python -m benchmarks.sessions --sessions 8 --rounds 3 --think 0.5 --json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+PASSWORD = "load-test"
+TIMEOUT = 120
+
+# (step, sidebar page, button clicked on it)
+PREDICTIONS = [
+    ("stress", "Stress Analysis", "Predict Stress"),
+    ("sleep", "Sleep Analysis", "Predict Sleep Quality"),
+    ("calorie", "Calorie Analysis", "Predict Calories"),
+]
+STEPS = [
+    "open", "signup", "login", "stress", "sleep", "calorie",
+    "dashboard", "recommendations", "history",
+]
+
+
+class FlowError(Exception):
+    pass
+
+
+# --------------------------------------------------
+# SERVER
+# --------------------------------------------------
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(cwd, port, log):
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP,
+            "--server.headless", "true",
+            "--server.address", "127.0.0.1",
+            "--server.port", str(port),
+            "--server.fileWatcherType", "none",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=cwd,
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + TIMEOUT
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"streamlit exited with status {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("streamlit did not become healthy")
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+# --------------------------------------------------
+# CLIENT
+# --------------------------------------------------
+class Session:
+    """One browser tab: an app websocket plus the widget values it sends.
+
+    Like the frontend, it resends the value of every widget on the page
+    with each rerun, so text inputs and the sidebar radio keep their state.
+    """
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.values = {}
+        self.widgets = {}
+        self.alerts = []
+        self.exceptions = []
+
+    async def rerun(self, trigger=None):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        msg = BackMsg()
+        states = msg.rerun_script.widget_states.widgets
+        states.extend(self.values.values())
+        if trigger is not None:
+            states.append(WidgetState(id=trigger, trigger_value=True))
+        await self.ws.send(msg.SerializeToString())
+
+        while True:
+            fwd = ForwardMsg.FromString(await asyncio.wait_for(self.ws.recv(), TIMEOUT))
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self.widgets, self.alerts, self.exceptions = {}, [], []
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._add_element(fwd.delta.new_element)
+            elif kind == "script_finished":
+                status = fwd.script_finished
+                if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise FlowError("app.py failed to compile")
+                if status != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    break
+        # Widgets that are no longer on the page drop out, as in the browser.
+        ids = {proto.id for proto in self.widgets.values()}
+        self.values = {k: v for k, v in self.values.items() if k in ids}
+        if self.exceptions:
+            raise FlowError(self.exceptions[0])
+
+    def _add_element(self, element):
+        kind = element.WhichOneof("type")
+        proto = getattr(element, kind)
+        if kind == "alert":
+            self.alerts.append(proto.body)
+        elif kind == "exception":
+            self.exceptions.append(f"{proto.type}: {proto.message}")
+        elif getattr(proto, "id", None) and hasattr(proto, "label"):
+            self.widgets[proto.label] = proto
+
+    def _widget(self, label):
+        try:
+            return self.widgets[label]
+        except KeyError:
+            raise FlowError(f"no widget labelled {label!r}") from None
+
+    def type_text(self, label, text):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        proto = self._widget(label)
+        self.values[proto.id] = WidgetState(id=proto.id, string_value=text)
+
+    def choose(self, label, option):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        proto = self._widget(label)
+        if option not in proto.options:
+            raise FlowError(f"{label!r} has no option {option!r}")
+        self.values[proto.id] = WidgetState(id=proto.id, string_value=option)
+
+    async def click(self, label):
+        await self.rerun(trigger=self._widget(label).id)
+
+
+async def _step(name, timings, *actions):
+    """Await ``actions`` (each one rerun) and time them as one step."""
+    start = time.perf_counter()
+    for action in actions:
+        await action()
+    timings[name].append((time.perf_counter() - start) * 1000)
+
+
+async def run_flow(url, username, timings, think=0.0):
+    """One user's visit; returns True if Final Recommendations saved."""
+    from websockets.asyncio.client import connect
+
+    async with connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        s = Session(ws)
+
+        async def pause():
+            if think:
+                await asyncio.sleep(think)
+
+        async def open_page(page):
+            s.choose("Select Page", page)
+            await s.rerun()
+
+        await _step("open", timings, s.rerun)
+        await pause()
+        s.type_text("Create Username", username)
+        s.type_text("Create Password", PASSWORD)
+        await _step("signup", timings, lambda: s.click("Create Account"))
+        if not any(a.startswith("Account created") for a in s.alerts):
+            raise FlowError(f"signup: {s.alerts}")
+        await pause()
+        s.type_text("Username", username)
+        s.type_text("Password", PASSWORD)
+        await _step("login", timings, lambda: s.click("Login"))
+        if "Select Page" not in s.widgets:
+            raise FlowError(f"login: {s.alerts}")
+        for name, page, button in PREDICTIONS:
+            await pause()
+            await _step(name, timings, lambda: open_page(page), lambda: s.click(button))
+        await pause()
+        await _step("dashboard", timings, lambda: open_page("Visualization Dashboard"))
+        await pause()
+        await _step("recommendations", timings, lambda: open_page("Final Recommendations"))
+        saved = any("saved to your history" in a for a in s.alerts)
+        await pause()
+        await _step("history", timings, lambda: open_page("My Health History"))
+        return saved
+
+
+# --------------------------------------------------
+# RAMP
+# --------------------------------------------------
+def lost_writes(created, saved):
+    """Signups and history saves missing from the server's files."""
+    from intellihealth import history, users
+
+    store = users.UserStore()
+    lost_signups = [u for u in created if not store.exists(u)]
+    lost_history = [u for u in saved if history.count_history(u) != 1]
+    return lost_signups, lost_history
+
+
+async def run_level(url, pid, sessions, rounds, think, level):
+    timings = {name: [] for name in STEPS}
+    errors, created, saved = [], [], []
+    peak = [rss_mb(pid)]
+
+    async def session(i):
+        for r in range(rounds):
+            username = f"load{level}-{i}-{r}"
+            local = {name: [] for name in STEPS}
+            try:
+                if await run_flow(url, username, local, think):
+                    saved.append(username)
+                else:
+                    errors.append(f"{username}: history was not saved")
+            except Exception as exc:
+                errors.append(f"{username}: {type(exc).__name__}: {exc}")
+            for name, samples in local.items():
+                timings[name].extend(samples)
+            if local["signup"]:
+                created.append(username)
+
+    async def watch_rss():
+        while True:
+            peak[0] = max(peak[0], rss_mb(pid))
+            await asyncio.sleep(0.05)
+
+    watcher = asyncio.create_task(watch_rss())
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    watcher.cancel()
+
+    lost_signups, lost_history = lost_writes(created, saved)
+    return {
+        "sessions": sessions,
+        "flows": len(saved),
+        "seconds": elapsed,
+        "flows_per_s": len(saved) / elapsed,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "lost_signups": len(lost_signups),
+        "lost_history": len(lost_history),
+        "peak_rss_mb": peak[0],
+        "steps_ms": {
+            name: {
+                "p50": float(np.percentile(samples, 50)),
+                "p95": float(np.percentile(samples, 95)),
+                "p99": float(np.percentile(samples, 99)),
+            }
+            for name, samples in timings.items()
+            if samples
+        },
+    }
+
+
+async def ramp(port, pid, levels, rounds, think):
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    # One untimed visit loads the models and page modules first.
+    await run_flow(url, "warmup", {name: [] for name in STEPS})
+    idle_mb = rss_mb(pid)
+    results = []
+    for level, sessions in enumerate(levels):
+        results.append(await run_level(url, pid, sessions, rounds, think, level))
+    return idle_mb, results
+
+
+def _print_results(idle_mb, results):
+    print(f"server RSS after warm-up: {idle_mb:.0f} MB")
+    print(
+        f"{'sessions':>8} {'flows':>6} {'flows/s':>8} {'errors':>7}"
+        f" {'lost':>5} {'RSS MB':>7}"
+    )
+    for r in results:
+        print(
+            f"{r['sessions']:>8} {r['flows']:>6} {r['flows_per_s']:>8.2f} {r['errors']:>7}"
+            f" {r['lost_signups'] + r['lost_history']:>5} {r['peak_rss_mb']:>7.0f}"
+        )
+    print()
+    print("step p50/p95 ms by sessions")
+    print(f"{'':<16}" + "".join(f"{r['sessions']:>14}" for r in results))
+    for name in STEPS:
+        cells = []
+        for r in results:
+            s = r["steps_ms"].get(name)
+            cells.append(f"{s['p50']:>8.0f}/{s['p95']:<5.0f}" if s else f"{'-':>14}")
+        print(f"{name:<16}" + "".join(cells))
+    for r in results:
+        for sample in r["error_samples"]:
+            print(f"ERROR ({r['sessions']} sessions) {sample}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sessions")
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--rounds", type=int, default=2, help="Flows per session per level")
+    parser.add_argument("--think", type=float, default=0.0, help="Seconds between steps")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    from benchmarks.run import scratch_dir
+    from intellihealth import inference
+
+    # The server runs in the scratch directory, so artifacts need a fixed path.
+    os.environ["INTELLIHEALTH_ARTIFACT_DIR"] = os.path.abspath(inference.ARTIFACT_DIR)
+    with scratch_dir() as cwd, tempfile.TemporaryFile() as log:
+        port = _free_port()
+        server = start_server(cwd, port, log)
+        try:
+            idle_mb, results = asyncio.run(
+                ramp(port, server.pid, args.sessions, args.rounds, args.think)
+            )
+        except Exception:
+            log.seek(0)
+            sys.stderr.write(log.read().decode(errors="replace")[-4000:])
+            raise
+        finally:
+            server.terminate()
+            server.wait()
+
+    if args.json:
+        print(json.dumps({"idle_rss_mb": idle_mb, "levels": results}, indent=2))
+    else:
+        _print_results(idle_mb, results)
+    failed = any(r["errors"] or r["lost_signups"] or r["lost_history"] for r in results)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
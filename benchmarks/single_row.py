@@ -0,0 +1,61 @@
+"""Per-click cost of the single-row prediction path.
+
+Compares what a Predict button used to do - build a one-row
+``pd.DataFrame`` with ``columns=<model>_features`` and call ``predict`` -
+with ``Model.predict_row``, which fills a preallocated NumPy row::
+
+    python -m benchmarks.single_row
+"""
+
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.single_row")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    import pandas as pd
+
+    from benchmarks.run import timed
+    from intellihealth import inference
+    from intellihealth.schema import MODEL_NAMES, build_row, random_inputs
+
+    results = {}
+    for name in MODEL_NAMES:
+        model = inference.get_model(name)
+        row = build_row(name, {k: float(v[0]) for k, v in random_inputs(name, 1).items()})
+
+        def dataframe_path():
+            X = pd.DataFrame([row], columns=model.features)
+            return model.estimator.predict(X)[0]
+
+        before = timed(dataframe_path, args.rounds)
+        after = timed(lambda: model.predict_row(row), args.rounds)
+        results[name] = {
+            "estimator": type(model.estimator).__name__,
+            "dataframe": before,
+            "array": after,
+            "saved_ms": before["median_ms"] - after["median_ms"],
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'model':<8} {'estimator':<26} {'DataFrame ms':>13} {'array ms':>9} {'saved ms':>9}")
+    for name, r in results.items():
+        print(
+            f"{name:<8} {r['estimator']:<26} {r['dataframe']['median_ms']:>13.3f}"
+            f" {r['array']['median_ms']:>9.3f} {r['saved_ms']:>9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Cold-start import cost of each page, from ``python -X importtime``.
+
+Each page is rendered once through Streamlit's ``AppTest`` in a fresh
+interpreter with background model prefetch disabled, so the numbers are
+what that page alone imports::
+
+    python -m benchmarks.startup                  # table for every page
+    python -m benchmarks.startup --check          # fail on a budget breach
+    python -m benchmarks.startup --json --pages Login Home
+
+``--check`` fails if the login page imports any of ``HEAVY_MODULES`` or
+its imports take longer than ``--budget-ms``.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+HEAVY_MODULES = ("matplotlib", "pandas", "numpy", "sklearn", "joblib", "pyarrow")
+
+_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+page = sys.argv[1]
+at = AppTest.from_file(sys.argv[2], default_timeout=300)
+if page != "Login":
+    at.session_state["logged_in"] = True
+    at.session_state["username"] = "startup"
+    at.session_state["history_saved"] = True
+start = time.perf_counter()
+at.run()
+if page != "Login":
+    at.sidebar.radio[0].set_value(page)
+    at.run()
+print(json.dumps({
+    "first_render_s": time.perf_counter() - start,
+    "exceptions": [e.value for e in at.exception],
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """``{module: (self_us, cumulative_us)}`` from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(page):
+    # Run in a scratch directory so no real user or history files are touched.
+    with tempfile.TemporaryDirectory(prefix="intellihealth-startup-") as cwd:
+        out = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE, page, APP],
+            cwd=cwd,
+            env={**os.environ, "INTELLIHEALTH_PREFETCH": "0"},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(out.stderr)
+    heavy = {
+        name: modules[name][1] / 1000 for name in HEAVY_MODULES if name in modules
+    }
+    return {
+        **result,
+        "import_ms": sum(s for s, _ in modules.values()) / 1000,
+        "modules": len(modules),
+        "heavy_ms": heavy,
+    }
+
+
+def main(argv=None):
+    sys.path.insert(0, ROOT)
+    from intellihealth.ui import PAGES
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument(
+        "--pages", nargs="+", choices=["Login", *PAGES], default=["Login", *PAGES]
+    )
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+    if args.check and "Login" not in args.pages:
+        args.pages.insert(0, "Login")
+
+    results = {page: measure(page) for page in args.pages}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'page':<24} {'imports ms':>10} {'render s':>9}  heavy modules (cumulative ms)")
+        for page, r in results.items():
+            heavy = ", ".join(f"{k} {v:.0f}" for k, v in r["heavy_ms"].items()) or "-"
+            print(f"{page:<24} {r['import_ms']:>10.0f} {r['first_render_s']:>9.2f}  {heavy}")
+
+    failures = [f"{page}: {e}" for page, r in results.items() for e in r["exceptions"]]
+    if args.check:
+        login = results["Login"]
+        if login["heavy_ms"]:
+            failures.append(f"Login imports {', '.join(login['heavy_ms'])}")
+        if login["import_ms"] > args.budget_ms:
+            failures.append(
+                f"Login imports take {login['import_ms']:.0f} ms (budget {args.budget_ms:.0f} ms)"
+            )
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
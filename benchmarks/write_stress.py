@@ -0,0 +1,90 @@
+"""Concurrent-writer stress test for the write-behind writer.
+
+Starts ``--writers`` threads that each call ``save_history`` ``--rows``
+times and try to sign up ``--users`` accounts (every name is attempted by
+two threads), then flushes and checks that every history row landed and
+every account exists exactly once.  Runs in a temporary directory and
+exits non-zero if anything was lost::
+
+    python -m benchmarks.write_stress --writers 32 --rows 500
+    python -m benchmarks.write_stress --backend csv
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.write_stress")
+    parser.add_argument("--backend", choices=["sqlite", "csv"], default="sqlite")
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=500, help="History rows per writer")
+    parser.add_argument("--users", type=int, default=4, help="Signups per writer")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    os.environ["INTELLIHEALTH_HISTORY_BACKEND"] = args.backend
+    from benchmarks.run import scratch_dir
+    from intellihealth import history, users, writer
+
+    with scratch_dir():
+        barrier = threading.Barrier(args.writers)
+        created = []
+        step = max(args.rows // max(args.users, 1), 1)
+
+        def work(i):
+            barrier.wait()
+            for j in range(args.rows):
+                history.save_history(f"user{i}", j, 50.0, 2000.0)
+                if j % step == 0 and j // step < args.users:
+                    # Writers 2k and 2k + 1 race for the same name.
+                    name = f"member{i // 2}-{j}"
+                    if users.save_user(name, "pw"):
+                        created.append(name)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(args.writers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.flush()
+        elapsed = time.perf_counter() - start
+
+        saved = history.load_history()
+        per_user = saved.groupby("username")["stress"].agg(["count", "nunique"])
+        expected_users = len(set(created))
+        result = {
+            "backend": args.backend,
+            "writers": args.writers,
+            "history_expected": args.writers * args.rows,
+            "history_saved": len(saved),
+            "history_complete": bool(
+                len(per_user) == args.writers
+                and (per_user["count"] == args.rows).all()
+                and (per_user["nunique"] == args.rows).all()
+            ),
+            "signups_accepted": len(created),
+            "signups_unique": expected_users,
+            "users_on_disk": users.UserStore(users.USERS_CSV).count(),
+            "batches": writer.get_writer().batches,
+            "seconds": elapsed,
+        }
+
+    print(json.dumps(result, indent=2))
+    ok = (
+        result["history_saved"] == result["history_expected"]
+        and result["history_complete"]
+        and result["signups_accepted"] == result["signups_unique"] == result["users_on_disk"]
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""Columnar mirror of the health history for cohort-wide analytics.
+
+History is copied into a Parquet dataset, hive-partitioned by month and by
+a hash bucket of the username::
+
+    health_analytics/month=2025-03/bucket=7/part-<n>-0.parquet
+
+Queries go through ``pyarrow.dataset``. Month and user filters prune whole
+partitions, the remaining filters are pushed into the Parquet scan, and
+only the columns a view needs are read, so cohort views never parse the
+row-oriented history.
+
+``sync()`` appends the rows added to the history store since the last sync
+(tracked in ``_state.json``) as new files. ``compact()`` merges each
+partition's files into one.  Both hold a lock file in the store, so app
+processes and the CLI never copy the same rows twice.  Requires ``pyarrow``.
+
+    python -m intellihealth.analytics sync
+    python -m intellihealth.analytics compact
+    python -m intellihealth.analytics summary --start 2025-01 --end 2025-06
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialised.
+    fcntl = None
+
+import numpy as np
+
+from intellihealth import history as history_store
+from intellihealth import metrics
+
+ANALYTICS_DIR = os.environ.get("INTELLIHEALTH_ANALYTICS_DIR", "health_analytics")
+BUCKETS = 16
+
+# Same cut-offs as the Stress and Sleep pages.
+STRESS_HIGH = 70
+SLEEP_POOR = 45
+
+METRIC_COLUMNS = ["stress", "sleep", "calories"]
+
+_STATE = "_state.json"
+_LOCK = "_lock"
+_lock = threading.Lock()
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("The analytics store requires the 'pyarrow' package") from exc
+    return pyarrow
+
+
+def user_bucket(username):
+    return zlib.crc32(username.encode("utf-8")) % BUCKETS
+
+
+def _partitioning(pa):
+    return pa.dataset.partitioning(
+        pa.schema([("month", pa.string()), ("bucket", pa.int32())]), flavor="hive"
+    )
+
+
+# --------------------------------------------------
+# WRITING
+# --------------------------------------------------
+@contextmanager
+def _locked(root):
+    """Hold the store lock, across threads and processes."""
+    with _lock:
+        os.makedirs(root, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(root, _LOCK), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_state(root):
+    try:
+        with open(os.path.join(root, _STATE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"backend": None, "position": 0, "files": 0}
+
+
+def _write_state(root, state):
+    tmp = os.path.join(root, _STATE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, os.path.join(root, _STATE))
+
+
+def _to_table(pa, df):
+    buckets = {u: user_bucket(u) for u in df["username"].unique()}
+    return pa.table({
+        "username": pa.array(df["username"], pa.string()),
+        "timestamp": pa.array(df["timestamp"], pa.string()),
+        "stress": pa.array(df["stress"], pa.float64()),
+        "sleep": pa.array(df["sleep"], pa.float64()),
+        "calories": pa.array(df["calories"], pa.float64()),
+        "month": pa.array(df["timestamp"].str[:7], pa.string()),
+        "bucket": pa.array(df["username"].map(buckets), pa.int32()),
+    })
+
+
+def write_table(table, root=ANALYTICS_DIR, tag="0"):
+    """Append ``table`` (with ``month`` and ``bucket`` columns) as new files."""
+    pa = _require_pyarrow()
+    pa.dataset.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=_partitioning(pa),
+        basename_template=f"part-{tag}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        # Without a minimum every input batch becomes a tiny row group in
+        # each partition it touches, which makes scans slow.
+        min_rows_per_group=1 << 16,
+        max_rows_per_group=1 << 20,
+    )
+
+
+def sync(root=ANALYTICS_DIR, batch_size=500_000):
+    """Copy history rows added since the last sync; returns how many."""
+    pa = _require_pyarrow()
+    store = history_store.get_history_store()
+    with _locked(root), metrics.span("analytics_sync"):
+        state = _read_state(root)
+        if state["backend"] not in (None, store.name):
+            raise ValueError(
+                f"{root} mirrors the {state['backend']!r} history backend, not "
+                f"{store.name!r}; delete it to rebuild"
+            )
+        state["backend"] = store.name
+        copied = 0
+        for df, position in store.iter_since(state["position"], batch_size):
+            write_table(_to_table(pa, df), root, tag=str(state["files"]))
+            state["files"] += 1
+            state["position"] = position
+            copied += len(df)
+            # Saved per batch so an interrupted sync resumes where it stopped.
+            _write_state(root, state)
+        _write_state(root, state)
+        return copied
+
+
+def compact(root=ANALYTICS_DIR):
+    """Rewrite every partition holding several files as a single file."""
+    pa = _require_pyarrow()
+    merged = 0
+    with _locked(root):
+        state = _read_state(root)
+        for dirpath, _, filenames in os.walk(root):
+            parts = sorted(f for f in filenames if f.endswith(".parquet"))
+            if len(parts) < 2:
+                continue
+            paths = [os.path.join(dirpath, f) for f in parts]
+            # A plain file list: the month/bucket columns stay in the path only.
+            table = pa.dataset.dataset(paths, format="parquet").to_table()
+            target = os.path.join(dirpath, f"part-c{state['files']}-0.parquet")
+            pa.parquet.write_table(table, target + ".tmp")
+            os.replace(target + ".tmp", target)
+            for path in paths:
+                os.remove(path)
+            merged += len(paths)
+        if merged:
+            state["files"] += 1
+            _write_state(root, state)
+    return merged
+
+
+# --------------------------------------------------
+# QUERIES
+# --------------------------------------------------
+def _dataset(root):
+    pa = _require_pyarrow()
+    return pa, pa.dataset.dataset(
+        root, format="parquet", partitioning=_partitioning(pa),
+        exclude_invalid_files=True,
+    )
+
+
+def _filter(pa, start_month=None, end_month=None, username=None):
+    field = pa.dataset.field
+    expr = None
+    clauses = []
+    if start_month:
+        clauses.append(field("month") >= start_month)
+    if end_month:
+        clauses.append(field("month") <= end_month)
+    if username is not None:
+        clauses.append(field("bucket") == user_bucket(username))
+        clauses.append(field("username") == username)
+    for clause in clauses:
+        expr = clause if expr is None else expr & clause
+    return expr
+
+
+def version(root=ANALYTICS_DIR):
+    """Changes whenever ``sync()`` or ``compact()`` changes the files."""
+    state = _read_state(root)
+    return state["files"], state["position"]
+
+
+def months(root=ANALYTICS_DIR):
+    """Months present in the store, oldest first."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        d.split("=", 1)[1] for d in os.listdir(root) if d.startswith("month=")
+    )
+
+
+def scan(columns, start_month=None, end_month=None, username=None, root=ANALYTICS_DIR):
+    """Arrow table of ``columns`` for the matching rows."""
+    pa, dataset = _dataset(root)
+    return dataset.to_table(
+        columns=columns, filter=_filter(pa, start_month, end_month, username)
+    )
+
+
+def user_means(start_month=None, end_month=None, root=ANALYTICS_DIR):
+    """One row per user: record count and mean stress / sleep / calories."""
+    with metrics.span("analytics_user_means"):
+        table = scan(["username", *METRIC_COLUMNS], start_month, end_month, root=root)
+        grouped = table.group_by("username").aggregate(
+            [("stress", "count")] + [(c, "mean") for c in METRIC_COLUMNS]
+        )
+        df = grouped.to_pandas()
+    df.columns = [c.replace("_mean", "") for c in df.columns]
+    return df.rename(columns={"stress_count": "records"})
+
+
+def monthly_means(start_month=None, end_month=None, root=ANALYTICS_DIR):
+    """Cohort mean of each metric per month."""
+    with metrics.span("analytics_monthly_means"):
+        table = scan(["month", *METRIC_COLUMNS], start_month, end_month, root=root)
+        grouped = table.group_by("month").aggregate([(c, "mean") for c in METRIC_COLUMNS])
+        df = grouped.to_pandas().sort_values("month")
+    df.columns = [c.replace("_mean", "") for c in df.columns]
+    return df.reset_index(drop=True)
+
+
+def cohort_summary(start_month=None, end_month=None, root=ANALYTICS_DIR):
+    """Headline numbers plus the per-user means they were computed from.
+
+    A user counts as high-stress / poor-sleep when their mean over the
+    window is above ``STRESS_HIGH`` / below ``SLEEP_POOR``.
+    """
+    per_user = user_means(start_month, end_month, root)
+    users = len(per_user)
+    summary = {
+        "users": users,
+        "records": int(per_user["records"].sum()) if users else 0,
+        "share_stress_high": float((per_user["stress"] > STRESS_HIGH).mean()) if users else 0.0,
+        "share_sleep_poor": float((per_user["sleep"] < SLEEP_POOR).mean()) if users else 0.0,
+    }
+    return summary, per_user
+
+
+def distribution(values, lo=0, hi=100, width=5):
+    """``(bin_start, count)`` histogram of ``values`` on a fixed grid."""
+    edges = np.arange(lo, hi + width, width)
+    counts, _ = np.histogram(np.clip(values, lo, hi), bins=edges)
+    return edges[:-1], counts
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m intellihealth.analytics",
+        description="Maintain and query the columnar history mirror.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="Copy new history rows into the store")
+    sub.add_parser("compact", help="Merge each partition into one file")
+    summary = sub.add_parser("summary", help="Print cohort headline numbers")
+    summary.add_argument("--start", help="First month (YYYY-MM)")
+    summary.add_argument("--end", help="Last month (YYYY-MM)")
+    parser.add_argument("--root", default=ANALYTICS_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "sync":
+        print(f"Copied {sync(args.root)} rows into {args.root}")
+    elif args.command == "compact":
+        print(f"Merged {compact(args.root)} files in {args.root}")
+    else:
+        start = time.perf_counter()
+        result, _ = cohort_summary(args.start, args.end, args.root)
+        result["seconds"] = time.perf_counter() - start
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
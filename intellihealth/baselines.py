@@ -0,0 +1,185 @@
+"""Personal baselines: what is normal for each user.
+
+Every user has one state record holding, for stress, sleep and calories,
+an exponentially weighted moving (EWM) mean, variance and mean absolute
+deviation of their saved results, plus the record count.  Folding in a
+new record is O(1), so the SQLite history store updates the
+``baseline`` table in the same transaction as each insert, and reading a
+baseline is one primary-key lookup.
+
+Records are folded in insertion order.  Until ``1 / n`` drops below
+``ALPHA`` the weight is ``1 / n``, so the first records give a plain
+running mean instead of being swamped by the first value.  The z-score
+of a new result divides its distance from the mean by a robust scale
+estimated from the mean absolute deviation.  Once a user has
+``MIN_RECORDS`` records, each update is clipped to ``CLIP`` scales of the
+mean, so one outlier barely moves the baseline.  A result counts as
+unusual for the user when ``|z| >= Z_UNUSUAL``.
+
+``rebuild`` recomputes every state from history in one streaming pass.
+``state_frame`` computes the same state from a history DataFrame, for
+backends without a ``baseline`` table.
+"""
+
+import math
+import os
+
+from intellihealth.schema import all_finite
+
+METRICS = ("stress", "sleep", "calories")
+
+ALPHA = float(os.environ.get("INTELLIHEALTH_BASELINE_ALPHA", "0.1"))
+MIN_RECORDS = 5
+Z_UNUSUAL = 2.5
+CLIP = 3.0
+
+# sqrt(pi / 2): standard deviation per mean absolute deviation of a normal.
+_MAD_TO_SD = math.sqrt(math.pi / 2)
+
+# Smallest scale used for z-scores, so a very steady user is not flagged
+# for changes that are meaningless on the page.
+SCALE_FLOOR = {"stress": 2.0, "sleep": 2.0, "calories": 50.0}
+
+_STATE_COLUMNS = [f"{m}_{stat}" for m in METRICS for stat in ("mean", "var", "mad")]
+
+
+# --------------------------------------------------
+# ONLINE STATISTICS
+# --------------------------------------------------
+def new_state():
+    return {"n": 0, **{m: [0.0, 0.0, 0.0] for m in METRICS}}
+
+
+def scale(state, metric):
+    """Robust standard deviation of ``metric`` for this user."""
+    return max(_MAD_TO_SD * state[metric][2], SCALE_FLOOR[metric])
+
+
+def fold(state, values):
+    """Fold one record's ``(stress, sleep, calories)`` into ``state`` in place.
+
+    A record with a missing or non-finite value is skipped, so it cannot
+    turn the whole baseline into NaN.
+    """
+    if not all_finite(values):
+        return state
+    state["n"] += 1
+    n = state["n"]
+    alpha = max(ALPHA, 1.0 / n)
+    for metric, x in zip(METRICS, values):
+        entry = state[metric]
+        if n == 1:
+            entry[:] = [float(x), 0.0, 0.0]
+            continue
+        mean, var, mad = entry
+        diff = float(x) - mean
+        if n > MIN_RECORDS:
+            limit = CLIP * scale(state, metric)
+            diff = min(max(diff, -limit), limit)
+        incr = alpha * diff
+        entry[0] = mean + incr
+        entry[1] = (1 - alpha) * (var + diff * incr)
+        entry[2] = (1 - alpha) * mad + alpha * abs(diff)
+    return state
+
+
+def zscores(state, values):
+    """``{metric: z}`` of a new result against the baseline, or ``{}`` while
+    the user has fewer than ``MIN_RECORDS`` records."""
+    if state is None or state["n"] < MIN_RECORDS:
+        return {}
+    return {
+        m: (float(x) - state[m][0]) / scale(state, m) for m, x in zip(METRICS, values)
+    }
+
+
+def unusual(state, values):
+    """The metrics whose result is unusual for this user, with their z-scores."""
+    return {m: z for m, z in zscores(state, values).items() if abs(z) >= Z_UNUSUAL}
+
+
+def _to_row(username, state):
+    return (username, state["n"], *(v for m in METRICS for v in state[m]))
+
+
+def _from_row(row):
+    state = {"n": row[0]}
+    for i, m in enumerate(METRICS):
+        state[m] = list(row[1 + 3 * i:4 + 3 * i])
+    return state
+
+
+# --------------------------------------------------
+# SQLITE STATE
+# --------------------------------------------------
+def ensure_schema(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS baseline ("
+        " username TEXT PRIMARY KEY, n INTEGER NOT NULL, "
+        + ", ".join(f"{c} REAL" for c in _STATE_COLUMNS)
+        + ") WITHOUT ROWID"
+    )
+
+
+_REPLACE = (
+    "INSERT OR REPLACE INTO baseline (username, n, "
+    + ", ".join(_STATE_COLUMNS)
+    + ") VALUES (?, ?, "
+    + ", ".join("?" for _ in _STATE_COLUMNS)
+    + ")"
+)
+
+
+def load(conn, username):
+    """The user's state, or ``None`` before their first record."""
+    row = conn.execute(
+        f"SELECT n, {', '.join(_STATE_COLUMNS)} FROM baseline WHERE username = ?",
+        (username,),
+    ).fetchone()
+    return None if row is None else _from_row(row)
+
+
+def update(conn, rows):
+    """Fold history rows into ``baseline``; call inside the insert's transaction."""
+    states = {}
+    for username, _, *values in rows:
+        state = states.get(username)
+        if state is None:
+            state = states[username] = load(conn, username) or new_state()
+        # Columns after the metrics (e.g. model_version) are not folded.
+        fold(state, values[:len(METRICS)])
+    conn.executemany(_REPLACE, (_to_row(u, s) for u, s in states.items()))
+
+
+def rebuild(conn, batch_size=50_000):
+    """Recompute ``baseline`` from the history table in one pass."""
+    states = {}
+    cursor = conn.execute(
+        "SELECT username, stress, sleep, calories FROM history ORDER BY id"
+    )
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        for username, *values in batch:
+            state = states.get(username)
+            if state is None:
+                state = states[username] = new_state()
+            fold(state, values)
+
+    with conn:
+        conn.execute("DELETE FROM baseline")
+        conn.executemany(_REPLACE, (_to_row(u, s) for u, s in states.items()))
+    return len(states)
+
+
+# --------------------------------------------------
+# DATAFRAME FALLBACK
+# --------------------------------------------------
+def state_frame(history):
+    if history.empty:
+        return None
+    state = new_state()
+    for values in history[list(METRICS)].itertuples(index=False):
+        fold(state, values)
+    return state
@@ -0,0 +1,63 @@
+"""Bounded, thread-safe LRU cache for single-row predictions.
+
+Keys are feature vectors in ``<model>_features.pkl`` order, optionally
+rounded to the precision of the page widgets so that values which display
+identically share one entry.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class PredictionCache:
+    def __init__(self, maxsize=1024, decimals=None):
+        self.maxsize = maxsize
+        self.decimals = decimals
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def key(self, row):
+        if self.decimals is None:
+            return tuple(float(v) for v in row)
+        return tuple(round(float(v), d) for v, d in zip(row, self.decimals))
+
+    def lookup(self, key, compute):
+        """Cached value for ``key``, calling ``compute(key)`` on a miss."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        value = compute(key)
+        if self.maxsize <= 0:
+            return value
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
@@ -0,0 +1,65 @@
+"""Rendering for the Visualization Dashboard chart.
+
+Figures are built with the object-oriented ``matplotlib.figure.Figure``
+API, so they never enter pyplot's global figure manager and are freed as
+soon as they go out of scope.  Rendered PNG bytes are cached per
+``(stress, sleep, calories)`` triple.
+"""
+
+import io
+from functools import lru_cache
+
+from matplotlib.figure import Figure
+
+from intellihealth import metrics
+
+# Same output settings st.pyplot uses.
+PNG_DPI = 200
+
+
+def _round(value):
+    return round(float(value), 2)
+
+
+def indicators_png(stress, sleep, calories):
+    return _indicators_png(_round(stress), _round(sleep), _round(calories))
+
+
+@lru_cache(maxsize=256)
+def _indicators_png(stress, sleep, calories):
+    fig = Figure(figsize=(7, 5))
+    ax1 = fig.subplots()
+
+    # LEFT Y-axis → Stress & Sleep
+    ax1.bar(["Stress", "Sleep"], [stress, sleep], color=["red", "green"], width=0.5)
+    ax1.set_ylabel("Stress / Sleep Index")
+    ax1.set_ylim(0, 100)
+
+    # Threshold reference lines
+    ax1.axhline(70, color="red", linestyle="--", linewidth=1)
+    ax1.axhline(65, color="green", linestyle="--", linewidth=1)
+
+    # RIGHT Y-axis → Calories
+    ax2 = ax1.twinx()
+    ax2.bar(["Calories"], [calories], color="blue", width=0.4)
+    ax2.set_ylabel("Calories (kcal/day)")
+    ax2.set_ylim(0, max(3500, calories + 300))
+
+    ax2.axhline(2500, color="blue", linestyle=":", linewidth=1)
+
+    ax1.set_title("Health Indicators with Reference Thresholds")
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=PNG_DPI, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def _chart_cache_metrics():
+    info = _indicators_png.cache_info()
+    return [
+        ("chart_cache_hits_total", "counter", "Dashboard chart cache hits.", [({}, info.hits)]),
+        ("chart_cache_misses_total", "counter", "Dashboard chart renders.", [({}, info.misses)]),
+    ]
+
+
+metrics.register_collector(_chart_cache_metrics)
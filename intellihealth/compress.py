@@ -0,0 +1,227 @@
+"""Smaller "lite" variants of the tree-ensemble models.
+
+Each variant is a ``CompiledEnsemble`` (see ``intellihealth.forest``) built
+from the original pickle with some combination of:
+
+* tree-count pruning - keep the first fraction of the trees (or boosting
+  stages);
+* depth capping - cut every tree at a maximum depth, the cut node
+  predicting the mean of the samples that reached it;
+* float32 thresholds and leaf values;
+* compressed serialization - one deflated ``.npz`` instead of
+  memory-mappable ``.npy`` files.
+
+Variants are saved as ``<model>_model.<variant>.compiled/`` and picked up
+by the app when ``INTELLIHEALTH_MODEL_VARIANT=<variant>`` is set.  Build
+them, then compare size, load time, RSS, latency and prediction error
+against the original model over a grid within the page input ranges::
+
+    python -m intellihealth.compress build
+    python -m intellihealth.compress report --json > compress.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from intellihealth.forest import (
+    _memory_kb,
+    compile_ensemble,
+    compiled_path,
+    load_compiled,
+    source_signature,
+)
+from intellihealth.schema import MODEL_NAMES, grid_inputs
+
+VARIANTS = {
+    "f32": {"dtype": "float32"},
+    "half": {"tree_fraction": 0.5},
+    "depth10": {"max_depth": 10},
+    "npz": {"compress": True},
+    "lite": {"tree_fraction": 0.5, "max_depth": 12, "dtype": "float32", "compress": True},
+}
+
+# Baselines reported alongside the variants.
+BASELINES = ("pickle", "compiled")
+
+
+def build_variant(estimator, source=None, tree_fraction=1.0, max_depth=None, dtype=None):
+    """Compile ``estimator`` with the reductions of one variant spec."""
+    n_trees = None
+    if tree_fraction < 1.0:
+        total = len(np.ravel(getattr(estimator, "estimators_", [estimator])))
+        n_trees = max(1, int(round(total * tree_fraction)))
+    compiled = compile_ensemble(estimator, source, n_trees=n_trees, max_depth=max_depth)
+    if dtype is not None:
+        compiled = compiled.astype(dtype)
+    return compiled
+
+
+def artifact_size(path):
+    if os.path.isdir(path):
+        return sum(
+            os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)
+        )
+    return os.path.getsize(path)
+
+
+def _variant_path(pkl, variant):
+    if variant == "pickle":
+        return pkl
+    return compiled_path(pkl, None if variant == "compiled" else variant)
+
+
+def _load(pkl, variant):
+    import joblib
+
+    if variant == "pickle":
+        return joblib.load(pkl)
+    compiled = load_compiled(pkl, None if variant == "compiled" else variant)
+    if compiled is None:
+        raise SystemExit(f"{pkl}: no up-to-date {variant} artifact, run 'build' first")
+    return compiled
+
+
+# --------------------------------------------------
+# REPORT
+# --------------------------------------------------
+def _latency_ms(fn, repeat):
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _probe(name, variant):
+    """Run in a fresh interpreter: cold-load one artifact and report."""
+    from intellihealth.inference import artifact_path
+
+    before = _memory_kb().get("VmRSS", 0)
+    start = time.perf_counter()
+    model = _load(artifact_path(f"{name}_model.pkl"), variant)
+    model.predict(np.zeros((1, model.n_features_in_)))
+    print(json.dumps({
+        "load_s": time.perf_counter() - start,
+        "rss_mb": (_memory_kb().get("VmRSS", 0) - before) / 1024,
+    }))
+
+
+def report(names, variants, grid_rows=100_000):
+    import joblib
+    import pandas as pd
+
+    from intellihealth.inference import (
+        Model,
+        add_derived_features,
+        artifact_path,
+        feature_frame,
+        load_features,
+    )
+
+    results = {}
+    for name in names:
+        pkl = artifact_path(f"{name}_model.pkl")
+        original = Model(name, joblib.load(pkl), load_features(name))
+        df = add_derived_features(pd.DataFrame(grid_inputs(name, grid_rows)))
+        X = feature_frame(original, df).to_numpy()
+        expected = original.predict_rows(X)
+        batch = X[:10_000]
+
+        results[name] = {}
+        for variant in variants:
+            model = _load(pkl, variant)
+            cold = json.loads(subprocess.run(
+                [sys.executable, "-m", "intellihealth.compress", "probe",
+                 "--models", name, "--variants", variant],
+                capture_output=True, text=True, check=True,
+            ).stdout)
+            error = np.abs(model.predict(X) - expected)
+            results[name][variant] = {
+                "size_mb": artifact_size(_variant_path(pkl, variant)) / 1e6,
+                **cold,
+                "single_row_ms": _latency_ms(lambda: model.predict(X[:1]), 200),
+                "batch_10k_ms": _latency_ms(lambda: model.predict(batch), 5),
+                "max_abs_error": float(error.max()),
+                "mean_abs_error": float(error.mean()),
+                "grid_rows": len(X),
+            }
+    return results
+
+
+def _print_report(results):
+    print(
+        f"{'model':<8} {'variant':<9} {'size MB':>8} {'load s':>7} {'+RSS MB':>8}"
+        f" {'1-row ms':>9} {'10k ms':>8} {'max err':>9} {'mean err':>9}"
+    )
+    for name, variants in results.items():
+        for variant, r in variants.items():
+            print(
+                f"{name:<8} {variant:<9} {r['size_mb']:>8.2f} {r['load_s']:>7.2f}"
+                f" {r['rss_mb']:>8.1f} {r['single_row_ms']:>9.3f}"
+                f" {r['batch_10k_ms']:>8.1f} {r['max_abs_error']:>9.3g}"
+                f" {r['mean_abs_error']:>9.3g}"
+            )
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main(argv=None):
+    import joblib
+
+    from intellihealth.inference import artifact_path
+
+    parser = argparse.ArgumentParser(
+        prog="python -m intellihealth.compress",
+        description="Build and compare compressed variants of the models.",
+    )
+    parser.add_argument("command", choices=["build", "report", "probe"])
+    parser.add_argument(
+        "--models", nargs="+", choices=MODEL_NAMES, default=list(MODEL_NAMES)
+    )
+    parser.add_argument(
+        "--variants", nargs="+", choices=[*BASELINES, *VARIANTS], default=None
+    )
+    parser.add_argument("--grid-rows", type=int, default=100_000)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "probe":
+        return _probe(args.models[0], args.variants[0])
+
+    if args.command == "report":
+        variants = args.variants or [*BASELINES, *VARIANTS]
+        results = report(args.models, variants, args.grid_rows)
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            _print_report(results)
+        return
+
+    variants = [v for v in (args.variants or VARIANTS) if v in VARIANTS]
+    for name in args.models:
+        pkl = artifact_path(f"{name}_model.pkl")
+        estimator = joblib.load(pkl)
+        for variant in variants:
+            spec = dict(VARIANTS[variant])
+            compress = spec.pop("compress", False)
+            compiled = build_variant(estimator, source_signature(pkl), **spec)
+            path = compiled_path(pkl, variant)
+            compiled.save(path, compress=compress)
+            print(
+                f"{name}/{variant}: {compiled.n_trees} trees, {compiled.n_nodes} nodes,"
+                f" depth {compiled.max_depth}, {artifact_size(path) / 1e6:.2f} MB -> {path}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+"""Flat-array inference for the tree-ensemble models.
+
+``compile_ensemble`` turns a fitted scikit-learn tree ensemble into a
+handful of contiguous NumPy arrays holding every node of every tree
+(``feature``, ``threshold``, ``left``, ``right``, ``value``).  A
+``CompiledEnsemble`` then predicts a whole batch by walking all trees at
+once, one vectorized step per tree level, instead of dispatching to each
+estimator in Python.  The same walk yields per-feature contributions
+(``contributions``), using the mean target that every node stores.
+
+Supported estimators: ``DecisionTreeRegressor``, ``RandomForestRegressor``,
+``ExtraTreesRegressor`` and ``GradientBoostingRegressor``.
+
+Compiled models are written as ``<model>_model.compiled/`` directories of
+plain ``.npy`` files and memory-mapped read-only on load, so several
+Streamlit workers on one machine share a single copy of the node arrays.
+Reduced variants built by ``intellihealth.compress`` live next to them as
+``<model>_model.<variant>.compiled/``.
+
+Compile the shipped models (and check them against ``model.predict`` on
+random inputs within the page ranges), then compare cold-start time and
+RSS of the pickles against the compiled form, with::
+
+    python -m intellihealth.forest compile
+    python -m intellihealth.forest verify
+    python -m intellihealth.forest report
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from intellihealth.schema import MODEL_NAMES, random_inputs
+
+COMPILED_SUFFIX = "_model.compiled"
+
+_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+# Upper bound on rows * trees walked at once, to keep the index matrix small.
+_BLOCK_CELLS = 1 << 22
+
+
+class CompiledEnsemble:
+    def __init__(
+        self,
+        feature,
+        threshold,
+        left,
+        right,
+        value,
+        roots,
+        max_depth,
+        base,
+        scale,
+        n_features,
+        feature_names=None,
+        source=None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.base = float(base)
+        self.scale = float(scale)
+        self.n_features_in_ = int(n_features)
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.source = source
+        self._steps = None
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    def _leaf_values(self, X):
+        n = len(X)
+        idx = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+        rows = np.arange(n)[:, None]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[idx]] <= self.threshold[idx]
+            idx = np.where(go_left, self.left[idx], self.right[idx])
+        return self.value[idx]
+
+    def predict(self, X):
+        # scikit-learn trees compare float32 inputs against float64 thresholds.
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"Expected input with {self.n_features_in_} features, got shape {X.shape}"
+            )
+        out = np.empty(len(X))
+        block = max(1, _BLOCK_CELLS // self.n_trees)
+        for start in range(0, len(X), block):
+            leaves = self._leaf_values(X[start:start + block])
+            total = leaves.sum(axis=1, dtype=np.float64)
+            out[start:start + block] = self.base + self.scale * total
+        return out
+
+    # --------------------------------------------------
+    # ATTRIBUTIONS
+    # --------------------------------------------------
+    # Saabas-style: every split a row passes moves its running value from
+    # the parent's mean to the child's mean, and that change is credited to
+    # the parent's split feature.  Summed over the path this telescopes to
+    # leaf - root, so bias + contributions equals the prediction exactly.
+    def _step_table(self):
+        """Per node: the feature of its parent's split and its mean minus the
+        parent's.  Built on first use and kept with the model."""
+        if self._steps is None:
+            node_ids = np.arange(self.n_nodes, dtype=np.int32)
+            parent = node_ids.copy()
+            internal = self.left != node_ids
+            parent[self.left[internal]] = node_ids[internal]
+            parent[self.right[internal]] = node_ids[internal]
+            value = np.asarray(self.value, dtype=np.float64)
+            # Roots are their own parent, so they contribute nothing.
+            self._steps = (self.feature[parent], value - value[parent])
+        return self._steps
+
+    def contributions(self, X):
+        """``(bias, contributions)`` with ``contributions`` of shape
+        ``(n_rows, n_features)``; ``bias + contributions.sum(axis=1)`` is
+        ``predict(X)``."""
+        X = np.asarray(X, dtype=np.float32)
+        step_feature, step_value = self._step_table()
+        n, n_features = len(X), self.n_features_in_
+        out = np.zeros(n * n_features)
+        row_offset = (np.arange(n) * n_features)[:, None]
+        idx = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+        rows = np.arange(n)[:, None]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[idx]] <= self.threshold[idx]
+            nxt = np.where(go_left, self.left[idx], self.right[idx])
+            # Rows already at a leaf stay put and must not count it twice.
+            moved = nxt != idx
+            out += np.bincount(
+                (row_offset + step_feature[nxt]).ravel(),
+                weights=np.where(moved, step_value[nxt], 0.0).ravel(),
+                minlength=n * n_features,
+            )
+            idx = nxt
+        bias = self.base + self.scale * float(np.asarray(self.value, np.float64)[self.roots].sum())
+        return bias, self.scale * out.reshape(n, n_features)
+
+    def astype(self, dtype):
+        """A copy with thresholds and leaf values stored as ``dtype``."""
+        return CompiledEnsemble(
+            self.feature,
+            self.threshold.astype(dtype),
+            self.left,
+            self.right,
+            self.value.astype(dtype),
+            self.roots,
+            self.max_depth,
+            self.base,
+            self.scale,
+            self.n_features_in_,
+            getattr(self, "feature_names_in_", None),
+            self.source,
+        )
+
+    # --------------------------------------------------
+    # SERIALIZATION
+    # --------------------------------------------------
+    # A compiled model is a directory of uncompressed .npy files plus a
+    # meta.json, so the node arrays can be memory-mapped read-only and the
+    # page cache shared by every worker process on the machine.  With
+    # ``compress=True`` the arrays go into one deflated ``arrays.npz``
+    # instead: smaller on disk, but loaded into private memory.
+    def save(self, path, compress=False):
+        tmp = path + ".tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        if compress:
+            np.savez_compressed(
+                os.path.join(tmp, "arrays.npz"),
+                **{key: getattr(self, key) for key in _ARRAYS},
+            )
+        else:
+            for key in _ARRAYS:
+                np.save(os.path.join(tmp, f"{key}.npy"), getattr(self, key))
+        meta = {
+            "max_depth": self.max_depth,
+            "base": self.base,
+            "scale": self.scale,
+            "n_features": self.n_features_in_,
+            "feature_names": (
+                [str(f) for f in self.feature_names_in_]
+                if hasattr(self, "feature_names_in_")
+                else None
+            ),
+            "source": list(self.source) if self.source is not None else None,
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        shutil.rmtree(path, ignore_errors=True)
+        os.rename(tmp, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        packed = os.path.join(path, "arrays.npz")
+        if os.path.exists(packed):
+            with np.load(packed) as npz:
+                arrays = {key: npz[key] for key in _ARRAYS}
+        else:
+            arrays = {
+                # np.asarray drops the memmap subclass but keeps the mapping.
+                key: np.asarray(
+                    np.load(os.path.join(path, f"{key}.npy"), mmap_mode="r" if mmap else None)
+                )
+                for key in _ARRAYS
+            }
+        return cls(
+            **arrays,
+            max_depth=meta["max_depth"],
+            base=meta["base"],
+            scale=meta["scale"],
+            n_features=meta["n_features"],
+            feature_names=meta["feature_names"],
+            source=tuple(meta["source"]) if meta["source"] is not None else None,
+        )
+
+
+# --------------------------------------------------
+# COMPILER
+# --------------------------------------------------
+def _trees(estimator, n_trees=None):
+    """``(trees, base, scale)`` such that predict = base + scale * sum(trees).
+
+    ``n_trees`` keeps only the first trees (boosting stages) of an ensemble.
+    """
+    kind = type(estimator).__name__
+    if kind == "DecisionTreeRegressor":
+        return [estimator], 0.0, 1.0
+    if kind in ("RandomForestRegressor", "ExtraTreesRegressor"):
+        trees = list(estimator.estimators_)[:n_trees]
+        return trees, 0.0, 1.0 / len(trees)
+    if kind == "GradientBoostingRegressor":
+        if estimator.init_ == "zero":
+            base = 0.0
+        else:
+            zeros = np.zeros((1, estimator.n_features_in_))
+            base = float(np.ravel(estimator.init_.predict(zeros))[0])
+        trees = list(estimator.estimators_[:n_trees, 0])
+        return trees, base, estimator.learning_rate
+    raise TypeError(f"Cannot compile estimator of type {kind}")
+
+
+def _node_depths(t):
+    depth = np.zeros(t.node_count, dtype=np.int32)
+    frontier = np.array([0])
+    level = 0
+    while len(frontier):
+        depth[frontier] = level
+        children = np.concatenate([t.children_left[frontier], t.children_right[frontier]])
+        frontier = children[children != -1]
+        level += 1
+    return depth
+
+
+def compile_ensemble(estimator, source=None, n_trees=None, max_depth=None):
+    """Flatten ``estimator``; optionally keep only the first ``n_trees`` and
+    cut every tree at ``max_depth``.
+
+    A cut node becomes a leaf predicting its own value, which scikit-learn
+    stores for every node (the mean target of the samples reaching it).
+    """
+    trees, base, scale = _trees(estimator, n_trees)
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    depth_reached = 0
+    for tree in trees:
+        t = tree.tree_
+        is_leaf = t.children_left == -1
+        keep = slice(None)
+        children_left, children_right = t.children_left, t.children_right
+        tree_depth = t.max_depth
+        if max_depth is not None and t.max_depth > max_depth:
+            depth = _node_depths(t)
+            is_leaf = is_leaf | (depth == max_depth)
+            keep = depth <= max_depth
+            # Renumber the surviving nodes contiguously.
+            new_id = np.cumsum(keep, dtype=np.int64) - 1
+            children_left = np.where(is_leaf, -1, new_id[children_left])[keep]
+            children_right = np.where(is_leaf, -1, new_id[children_right])[keep]
+            is_leaf = is_leaf[keep]
+            tree_depth = max_depth
+        n_nodes = len(is_leaf)
+        node_ids = np.arange(n_nodes, dtype=np.int32) + offset
+        # Leaves point at themselves so every row can take the same number
+        # of steps regardless of which leaf it lands in.
+        left.append(np.where(is_leaf, node_ids, children_left + offset))
+        right.append(np.where(is_leaf, node_ids, children_right + offset))
+        feature.append(np.where(is_leaf, 0, t.feature[keep]))
+        threshold.append(np.where(is_leaf, 0.0, t.threshold[keep]))
+        value.append(t.value[keep, 0, 0])
+        roots.append(offset)
+        offset += n_nodes
+        depth_reached = max(depth_reached, tree_depth)
+
+    return CompiledEnsemble(
+        feature=np.concatenate(feature).astype(np.int32),
+        threshold=np.concatenate(threshold).astype(np.float64),
+        left=np.concatenate(left).astype(np.int32),
+        right=np.concatenate(right).astype(np.int32),
+        value=np.concatenate(value).astype(np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+        max_depth=depth_reached,
+        base=base,
+        scale=scale,
+        n_features=estimator.n_features_in_,
+        feature_names=getattr(estimator, "feature_names_in_", None),
+        source=source,
+    )
+
+
+def source_signature(path):
+    """Identifies the pickle a compiled model was built from."""
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns)
+
+
+def compiled_path(pkl_path, variant=None):
+    base = pkl_path[: -len("_model.pkl")]
+    if variant:
+        return f"{base}_model.{variant}.compiled"
+    return base + COMPILED_SUFFIX
+
+
+def load_compiled(pkl_path, variant=None):
+    """The compiled form of ``pkl_path`` if present and up to date, else None."""
+    path = compiled_path(pkl_path, variant)
+    if not os.path.isdir(path):
+        return None
+    compiled = CompiledEnsemble.load(path)
+    if os.path.exists(pkl_path) and compiled.source != source_signature(pkl_path):
+        return None
+    return compiled
+
+
+# --------------------------------------------------
+# EQUIVALENCE CHECK
+# --------------------------------------------------
+def check_equivalence(model, compiled, n=10_000, seed=0):
+    """Max absolute difference between ``model.predict`` and ``compiled``."""
+    import pandas as pd
+
+    from intellihealth.inference import add_derived_features, feature_frame
+
+    df = add_derived_features(pd.DataFrame(random_inputs(model.name, n, seed)))
+    X = feature_frame(model, df)
+    expected = model.estimator.predict(X)
+    actual = compiled.predict(X.to_numpy())
+    return float(np.max(np.abs(expected - actual)))
+
+
+# --------------------------------------------------
+# COLD-START / RSS REPORT
+# --------------------------------------------------
+def _memory_kb():
+    """VmRSS and its anonymous / file-backed split, from /proc (Linux only)."""
+    usage = {}
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile"):
+                    usage[key] = int(rest.split()[0])
+    except OSError:
+        pass
+    return usage
+
+
+def _probe(source, names):
+    """Run in a fresh interpreter: load ``names`` from ``source`` and report."""
+    import joblib
+
+    from intellihealth.inference import artifact_path
+
+    before = _memory_kb()
+    start = time.perf_counter()
+    for name in names:
+        pkl = artifact_path(f"{name}_model.pkl")
+        if source == "pickle":
+            joblib.load(pkl)
+        else:
+            compiled = load_compiled(pkl)
+            if compiled is None:
+                raise SystemExit(f"{name}: no up-to-date compiled model")
+            # Touch every node page once, as a real prediction workload would.
+            compiled.predict(np.zeros((1, compiled.n_features_in_)))
+            for key in _ARRAYS:
+                getattr(compiled, key).sum()
+    elapsed = time.perf_counter() - start
+    after = _memory_kb()
+    print(json.dumps({
+        "seconds": elapsed,
+        **{f"{k}_kb": after.get(k, 0) - before.get(k, 0) for k in after},
+    }))
+
+
+def report(names):
+    rows = []
+    for source in ("pickle", "compiled"):
+        out = subprocess.run(
+            [sys.executable, "-m", "intellihealth.forest", "probe",
+             "--source", source, "--models", *names],
+            capture_output=True, text=True, check=True,
+        )
+        rows.append((source, json.loads(out.stdout)))
+    print(f"{'artifacts':<10} {'load s':>8} {'RSS MB':>8} {'anon MB':>8} {'shared MB':>10}")
+    for source, r in rows:
+        print(
+            f"{source:<10} {r['seconds']:>8.2f} {r.get('VmRSS_kb', 0) / 1024:>8.1f}"
+            f" {r.get('RssAnon_kb', 0) / 1024:>8.1f} {r.get('RssFile_kb', 0) / 1024:>10.1f}"
+        )
+    print("'anon' is private to each worker; 'shared' is page cache shared between workers.")
+
+
+def main(argv=None):
+    import joblib
+
+    from intellihealth.inference import Model, artifact_path, load_features
+
+    parser = argparse.ArgumentParser(
+        prog="python -m intellihealth.forest",
+        description="Compile tree-ensemble models to flat NumPy arrays.",
+    )
+    parser.add_argument("command", choices=["compile", "verify", "report", "probe"])
+    parser.add_argument(
+        "--models", nargs="+", choices=MODEL_NAMES, default=list(MODEL_NAMES)
+    )
+    parser.add_argument("--samples", type=int, default=10_000)
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    parser.add_argument("--source", choices=["pickle", "compiled"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        return report(args.models)
+    if args.command == "probe":
+        return _probe(args.source, args.models)
+
+    failed = False
+    for name in args.models:
+        pkl = artifact_path(f"{name}_model.pkl")
+        model = Model(name, joblib.load(pkl), load_features(name))
+        if args.command == "compile":
+            compiled = compile_ensemble(model.estimator, source=source_signature(pkl))
+            compiled.save(compiled_path(pkl))
+            print(
+                f"{name}: {compiled.n_trees} trees, {compiled.n_nodes} nodes, "
+                f"depth {compiled.max_depth} -> {compiled_path(pkl)}"
+            )
+        else:
+            compiled = load_compiled(pkl)
+            if compiled is None:
+                print(f"{name}: no up-to-date compiled model, run 'compile' first")
+                failed = True
+                continue
+        error = check_equivalence(model, compiled, n=args.samples)
+        ok = error <= args.tolerance
+        failed = failed or not ok
+        print(f"{name}: max |predict - compiled| = {error:.3g} ({'ok' if ok else 'FAIL'})")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""User-wise health history storage.
+
+Two interchangeable backends are provided:
+
+* ``sqlite`` (default) - one WAL-mode SQLite table with an index on
+  ``username`` so appends are O(1) and per-user reads only touch that
+  user's rows.
+* ``csv`` - the original ``health_history.csv`` file, appended in place.
+
+The backend is chosen with the ``INTELLIHEALTH_HISTORY_BACKEND``
+environment variable.  The first time the SQLite backend is opened it
+imports any existing ``health_history.csv`` (one-shot migration).
+
+``save_history`` does not write itself: rows go through the shared
+write-behind writer (``intellihealth.writer``), which commits everything
+pending in one transaction and one fsync.  The read functions flush it
+first, so a session always sees its own saves.
+
+Each record carries the ``model_version`` that produced its scores (see
+``intellihealth.registry``).  Stores created before that column existed
+gain it on first use, with empty values for the old rows.
+
+The SQLite backend also keeps each user's personal baseline (see
+``intellihealth.baselines``) up to date with every insert.
+"""
+
+import argparse
+import io
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from intellihealth import baselines, metrics, trends, writer
+
+HISTORY_COLUMNS = ["username", "timestamp", "stress", "sleep", "calories", "model_version"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+
+HISTORY_CSV = "health_history.csv"
+HISTORY_DB = "health_history.db"
+
+
+def make_row(username, stress, sleep, calories, timestamp=None, model_version=None):
+    if timestamp is None:
+        timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+    return [username, timestamp, float(stress), float(sleep), float(calories), model_version]
+
+
+def _with_all_columns(df):
+    """``df`` with every history column, old files lacking ``model_version``."""
+    df = df.reindex(columns=HISTORY_COLUMNS)
+    return df.astype({"model_version": object}).where(df.notna(), None)
+
+
+def _empty_history(columns=HISTORY_COLUMNS):
+    return pd.DataFrame(columns=columns)
+
+
+def _check_columns(columns):
+    unknown = [c for c in columns if c not in HISTORY_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown history columns: {unknown}")
+    return list(columns)
+
+
+# --------------------------------------------------
+# CSV BACKEND
+# --------------------------------------------------
+class CsvHistoryStore:
+    name = "csv"
+
+    def __init__(self, path=HISTORY_CSV):
+        self.path = path
+        self._lock = threading.Lock()
+        self._header_checked = False
+
+    def _read(self, username=None, start=None, end=None):
+        try:
+            df = pd.read_csv(self.path)
+            if df.empty or len(df.columns) == 0:
+                raise pd.errors.EmptyDataError
+        except (FileNotFoundError, pd.errors.EmptyDataError):
+            return _empty_history()
+        if "model_version" not in df.columns:
+            df["model_version"] = None
+        mask = pd.Series(True, index=df.index)
+        if username is not None:
+            mask &= df["username"] == username
+        if start is not None:
+            mask &= df["timestamp"] >= start
+        if end is not None:
+            mask &= df["timestamp"] < end
+        return df[mask].reset_index(drop=True)
+
+    def load(
+        self,
+        username=None,
+        start=None,
+        end=None,
+        limit=None,
+        offset=0,
+        columns=HISTORY_COLUMNS,
+    ):
+        df = self._read(username, start, end)[_check_columns(columns)]
+        if limit is not None:
+            df = df.iloc[offset:offset + limit].reset_index(drop=True)
+        return df
+
+    def count(self, username=None, start=None, end=None):
+        return len(self._read(username, start, end))
+
+    def bounds(self, username):
+        df = self._read(username)
+        if df.empty:
+            return None, None
+        return df["timestamp"].min(), df["timestamp"].max()
+
+    def trend_periods(self, username, period):
+        return trends.periods_frame(self._read(username), period)
+
+    def rolling_means(self, username):
+        return trends.rolling_frame(self._read(username))
+
+    def baseline(self, username):
+        return baselines.state_frame(self._read(username))
+
+    def iter_since(self, position=0, batch_size=100_000):
+        """``(frame, position)`` batches of the rows after data row ``position``."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            chunks = pd.read_csv(
+                self.path, skiprows=range(1, position + 1), chunksize=batch_size
+            )
+            for chunk in chunks:
+                position += len(chunk)
+                yield _with_all_columns(chunk).reset_index(drop=True), position
+        except pd.errors.EmptyDataError:
+            return
+
+    def append(self, row):
+        self.append_many([row])
+
+    def _upgrade_header(self):
+        """Rewrite a file from before ``model_version`` with that column added."""
+        if self._header_checked:
+            return
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, encoding="utf-8") as f:
+                header = f.readline().strip().split(",")
+            if header != HISTORY_COLUMNS:
+                tmp = self.path + ".tmp"
+                _with_all_columns(pd.read_csv(self.path)).to_csv(tmp, index=False)
+                os.replace(tmp, self.path)
+        self._header_checked = True
+
+    def append_many(self, rows):
+        if not rows:
+            return
+        with self._lock:
+            self._upgrade_header()
+            write_header = (
+                not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            )
+            buf = io.StringIO()
+            pd.DataFrame(rows, columns=HISTORY_COLUMNS).to_csv(
+                buf, header=write_header, index=False
+            )
+            # One append and one fsync per batch.
+            with open(self.path, "a", encoding="utf-8", newline="") as f:
+                f.write(buf.getvalue())
+                f.flush()
+                os.fsync(f.fileno())
+
+
+# --------------------------------------------------
+# SQLITE BACKEND
+# --------------------------------------------------
+class SqliteHistoryStore:
+    name = "sqlite"
+
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # FULL syncs the WAL on every commit, i.e. once per writer batch.
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " username TEXT NOT NULL,"
+                " timestamp TEXT NOT NULL,"
+                " stress REAL, sleep REAL, calories REAL, model_version TEXT)"
+            )
+            existing = {r[1] for r in conn.execute("PRAGMA table_info(history)")}
+            if "model_version" not in existing:
+                conn.execute("ALTER TABLE history ADD COLUMN model_version TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_username"
+                " ON history (username, id)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_username_timestamp"
+                " ON history (username, timestamp)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            trends.ensure_schema(conn)
+            baselines.ensure_schema(conn)
+            conn.commit()
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _where(username, start, end):
+        clauses = []
+        params = []
+        if username is not None:
+            clauses.append("username = ?")
+            params.append(username)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    def load(
+        self,
+        username=None,
+        start=None,
+        end=None,
+        limit=None,
+        offset=0,
+        columns=HISTORY_COLUMNS,
+    ):
+        columns = _check_columns(columns)
+        where, params = self._where(username, start, end)
+        sql = f"SELECT {', '.join(columns)} FROM history{where} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        df = pd.read_sql_query(sql, self._connect(), params=params)
+        if df.empty:
+            return _empty_history(columns)
+        return df
+
+    def count(self, username=None, start=None, end=None):
+        where, params = self._where(username, start, end)
+        sql = f"SELECT COUNT(*) FROM history{where}"
+        return self._connect().execute(sql, params).fetchone()[0]
+
+    def bounds(self, username):
+        return self._connect().execute(
+            "SELECT MIN(timestamp), MAX(timestamp) FROM history WHERE username = ?",
+            (username,),
+        ).fetchone()
+
+    def trend_periods(self, username, period):
+        return trends.load_periods(self._connect(), username, period)
+
+    def rolling_means(self, username):
+        return trends.rolling_means(self._connect(), username)
+
+    def baseline(self, username):
+        return baselines.load(self._connect(), username)
+
+    def rebuild_trends(self):
+        conn = self._connect()
+        groups = trends.rebuild(conn)
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('trends_built', '1')")
+        return groups
+
+    def ensure_trends(self):
+        """Backfill trend aggregates once for databases created before them."""
+        built = self._connect().execute(
+            "SELECT value FROM meta WHERE key = 'trends_built'"
+        ).fetchone()
+        if built is None:
+            self.rebuild_trends()
+
+    def rebuild_baselines(self):
+        conn = self._connect()
+        users = baselines.rebuild(conn)
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('baselines_built', '1')"
+            )
+        return users
+
+    def ensure_baselines(self):
+        """Backfill baselines once for databases created before them."""
+        built = self._connect().execute(
+            "SELECT value FROM meta WHERE key = 'baselines_built'"
+        ).fetchone()
+        if built is None:
+            self.rebuild_baselines()
+
+    def iter_since(self, position=0, batch_size=100_000):
+        """``(frame, position)`` batches of the rows with ``id > position``."""
+        conn = self._connect()
+        while True:
+            df = pd.read_sql_query(
+                f"SELECT id, {', '.join(HISTORY_COLUMNS)} FROM history"
+                " WHERE id > ? ORDER BY id LIMIT ?",
+                conn,
+                params=(position, batch_size),
+            )
+            if df.empty:
+                return
+            position = int(df["id"].iloc[-1])
+            yield df[HISTORY_COLUMNS], position
+
+    def append(self, row):
+        self.append_many([row])
+
+    def append_many(self, rows):
+        if not rows:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO history"
+                " (username, timestamp, stress, sleep, calories, model_version)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            trends.update(conn, rows)
+            baselines.update(conn, rows)
+
+    def migrate_from_csv(self, csv_path=HISTORY_CSV, chunksize=50_000):
+        """Import ``csv_path`` once; returns the number of rows copied."""
+        conn = self._connect()
+        done = conn.execute(
+            "SELECT value FROM meta WHERE key = 'migrated_from_csv'"
+        ).fetchone()
+        if done is not None or not os.path.exists(csv_path):
+            return 0
+
+        copied = 0
+        with conn:
+            try:
+                for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+                    rows = _with_all_columns(chunk).values.tolist()
+                    conn.executemany(
+                        "INSERT INTO history"
+                        " (username, timestamp, stress, sleep, calories, model_version)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    trends.update(conn, rows)
+                    baselines.update(conn, rows)
+                    copied += len(chunk)
+            except pd.errors.EmptyDataError:
+                pass
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from_csv', ?)",
+                (os.path.abspath(csv_path),),
+            )
+        return copied
+
+
+# --------------------------------------------------
+# BACKEND SELECTION
+# --------------------------------------------------
+BACKENDS = {
+    "csv": CsvHistoryStore,
+    "sqlite": SqliteHistoryStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                backend = os.environ.get("INTELLIHEALTH_HISTORY_BACKEND", "sqlite")
+                if backend not in BACKENDS:
+                    raise ValueError(f"Unknown history backend: {backend!r}")
+                store = BACKENDS[backend]()
+                if isinstance(store, SqliteHistoryStore):
+                    store.migrate_from_csv()
+                    store.ensure_trends()
+                    store.ensure_baselines()
+                _store = store
+    return _store
+
+
+def _settled_store():
+    """The history store, after any queued saves have been committed."""
+    writer.flush()
+    return get_history_store()
+
+
+def load_history(username=None, start=None, end=None, limit=None, offset=0, columns=None):
+    """History rows, optionally for one user and ``start <= timestamp < end``.
+
+    ``start``/``end`` are timestamp strings (a date such as ``"2025-01-31"``
+    works too); ``limit``/``offset`` page through the rows in insertion order.
+    """
+    with metrics.span("load_history"):
+        return _settled_store().load(
+            username, start, end, limit, offset, columns or HISTORY_COLUMNS
+        )
+
+
+def count_history(username=None, start=None, end=None):
+    return _settled_store().count(username, start, end)
+
+
+def history_bounds(username):
+    """``(first, last)`` timestamps recorded for ``username``, or ``(None, None)``."""
+    return _settled_store().bounds(username)
+
+
+def load_trends(username, period):
+    """Per-``period`` ("day", "week" or "month") min/mean/max for ``username``."""
+    return _settled_store().trend_periods(username, period)
+
+
+def rolling_means(username):
+    """``{7: {...}, 30: {...}}`` mean stress/sleep/calories over recent days."""
+    return _settled_store().rolling_means(username)
+
+
+def load_baseline(username):
+    """The user's personal baseline state (``intellihealth.baselines``), or
+    ``None`` before their first saved record."""
+    return _settled_store().baseline(username)
+
+
+def save_history_many(rows):
+    """Insert many ``make_row`` records in one transaction, e.g. for imports.
+
+    Bypasses the write-behind queue (after draining it), so the rows are
+    committed when this returns.
+    """
+    writer.flush()
+    with metrics.span("save_history_many"):
+        get_history_store().append_many(rows)
+
+
+def _write_rows(rows):
+    get_history_store().append_many(rows)
+
+
+writer.register("history", _write_rows)
+
+
+def save_history(username, stress, sleep, calories, model_version=None):
+    """Queue one record; returns a ``Future`` resolved once it is committed."""
+    with metrics.span("save_history"):
+        return writer.submit(
+            "history",
+            make_row(username, stress, sleep, calories, model_version=model_version),
+        )
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m intellihealth.history",
+        description="Manage the IntelliHealth history store.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="Import health_history.csv into SQLite")
+    migrate.add_argument("--csv", default=HISTORY_CSV)
+    migrate.add_argument("--db", default=HISTORY_DB)
+    rebuild = sub.add_parser(
+        "rebuild-trends", help="Recompute trend aggregates from history"
+    )
+    rebuild.add_argument("--db", default=HISTORY_DB)
+    rebuild_baselines = sub.add_parser(
+        "rebuild-baselines", help="Recompute personal baselines from history"
+    )
+    rebuild_baselines.add_argument("--db", default=HISTORY_DB)
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        copied = SqliteHistoryStore(args.db).migrate_from_csv(args.csv)
+        print(f"Migrated {copied} rows from {args.csv} into {args.db}")
+    elif args.command == "rebuild-trends":
+        groups = SqliteHistoryStore(args.db).rebuild_trends()
+        print(f"Rebuilt {groups} trend aggregates in {args.db}")
+    elif args.command == "rebuild-baselines":
+        users = SqliteHistoryStore(args.db).rebuild_baselines()
+        print(f"Rebuilt baselines for {users} users in {args.db}")
+
+
+if __name__ == "__main__":
+    main()
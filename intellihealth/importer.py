@@ -0,0 +1,311 @@
+"""Bulk import of wearable exports into a user's scored history.
+
+Reads a Fitbit-style daily export (CSV, JSON array or JSON Lines) in
+chunks.  For each chunk it does the following:
+
+* maps the source columns onto the page inputs (``SOURCE_COLUMNS``);
+* derives ``minutes_asleep`` and ``sleep_light_ratio`` as the Sleep page
+  does;
+* scores the chunk with one vectorized ``predict`` per model;
+* inserts one history record per day in a single transaction.
+
+Only one chunk is held in memory at a time, whatever the file size::
+
+    python -m intellihealth.importer fitbit_daily.csv --user alice
+    python -m intellihealth.importer sleep.json --user alice --chunksize 5000
+
+Column names are matched case-, space- and punctuation-insensitively, so
+``TotalSteps``, ``total_steps`` and ``Total Steps`` all map to ``steps``.
+Values outside the page ranges are clipped to them.  Days missing an input
+some model needs are skipped, and so are days already in the user's history.
+"""
+
+import argparse
+import io
+import json
+import re
+
+import numpy as np
+
+from intellihealth import history as history_store
+from intellihealth import inference
+from intellihealth.registry import version_label
+from intellihealth.schema import INPUT_RANGES, MODEL_NAMES, OUTPUT_COLUMNS, raw_inputs
+
+DEFAULT_CHUNKSIZE = 10_000
+
+# Accepted source columns (normalized: lower case, letters and digits only).
+DATE_COLUMNS = ("date", "activitydate", "dateofsleep", "day", "timestamp")
+
+SOURCE_COLUMNS = {
+    "rmssd": ("rmssd", "dailyrmssd", "hrvrmssd", "hrv"),
+    "nremhr": ("nremhr", "nremheartrate"),
+    "resting_hr": ("restinghr", "restingheartrate"),
+    "nightly_temp": ("nightlytemp", "nightlytemperature", "skintemperature"),
+    "steps": ("steps", "totalsteps"),
+    "sedentary": ("sedentary", "sedentaryminutes"),
+    "sleep_duration": ("sleepduration", "sleephours", "totalhoursasleep"),
+    "efficiency": ("efficiency", "sleepefficiency"),
+    "deep": ("deep", "deepsleepratio"),
+    "rem": ("rem", "remsleepratio"),
+    "awake": ("awake", "minutesawake", "minutesawakeinbed"),
+    "breathing": ("breathing", "breathingrate", "fullsleepbreathingrate"),
+    "distance": ("distance", "totaldistance"),
+    "light": ("light", "lightlyactiveminutes", "lightactivityminutes"),
+    "moderate": ("moderate", "fairlyactiveminutes", "moderatelyactiveminutes"),
+    "vigorous": ("vigorous", "veryactiveminutes", "vigorousactivityminutes"),
+    "bpm": ("bpm", "averagebpm", "avgheartrate", "heartrate"),
+}
+
+# Minute counts that stand in for an input when it is missing: sleep in
+# minutes for ``sleep_duration`` (hours), stage minutes for the ratios.
+MINUTES_ASLEEP_COLUMNS = ("minutesasleep", "totalminutesasleep")
+STAGE_MINUTE_COLUMNS = {
+    "deep": ("deepminutes", "minutesdeep", "levelssummarydeepminutes"),
+    "rem": ("remminutes", "minutesrem", "levelssummaryremminutes"),
+}
+
+_NEEDED = list(dict.fromkeys(k for name in MODEL_NAMES for k in raw_inputs(name)))
+
+
+def normalize_name(name):
+    return re.sub(r"[^0-9a-z]", "", str(name).lower())
+
+
+# --------------------------------------------------
+# READERS
+# --------------------------------------------------
+def _source_format(source, fmt):
+    if fmt:
+        return fmt
+    name = (source if isinstance(source, str) else getattr(source, "name", "")).lower()
+    return "json" if name.endswith((".json", ".jsonl", ".ndjson")) else "csv"
+
+
+def iter_json_records(f, bufsize=1 << 16):
+    """Objects of a top-level JSON array (or of JSON Lines), decoded one at a
+    time from ``bufsize`` reads so the file is never loaded whole."""
+    decoder = json.JSONDecoder()
+    buf = ""
+    while True:
+        data = f.read(bufsize)
+        buf += data
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,[]":
+                pos += 1
+            if pos == len(buf):
+                break
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if not data:
+                    raise ValueError("Invalid or truncated JSON export") from None
+                break
+            yield record
+            pos = end
+        buf = buf[pos:]
+        if not data:
+            return
+
+
+def _json_chunks(f, chunksize):
+    import pandas as pd
+
+    records = []
+    for record in iter_json_records(f):
+        records.append(record)
+        if len(records) >= chunksize:
+            yield pd.json_normalize(records)
+            records = []
+    if records:
+        yield pd.json_normalize(records)
+
+
+def iter_raw_chunks(source, chunksize=DEFAULT_CHUNKSIZE, fmt=None):
+    """DataFrames of at most ``chunksize`` source rows, columns as exported."""
+    import pandas as pd
+
+    if _source_format(source, fmt) == "csv":
+        yield from pd.read_csv(source, chunksize=chunksize)
+    elif isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            yield from _json_chunks(f, chunksize)
+    elif isinstance(source, io.TextIOBase):
+        yield from _json_chunks(source, chunksize)
+    else:
+        yield from _json_chunks(io.TextIOWrapper(source, encoding="utf-8"), chunksize)
+
+
+# --------------------------------------------------
+# COLUMN MAPPING
+# --------------------------------------------------
+def _find(columns, candidates):
+    for candidate in candidates:
+        if candidate in columns:
+            return columns[candidate]
+    return None
+
+
+def column_mapping(source_columns):
+    """``{input_key or "date": source column}`` for the columns present."""
+    columns = {}
+    for col in source_columns:
+        columns.setdefault(normalize_name(col), col)
+    mapping = {}
+    date = _find(columns, DATE_COLUMNS)
+    if date is not None:
+        mapping["date"] = date
+    for key, candidates in SOURCE_COLUMNS.items():
+        col = _find(columns, candidates)
+        if col is not None:
+            mapping[key] = col
+    asleep = _find(columns, MINUTES_ASLEEP_COLUMNS)
+    if asleep is not None:
+        mapping["minutes_asleep"] = asleep
+    for key, candidates in STAGE_MINUTE_COLUMNS.items():
+        col = _find(columns, candidates)
+        if col is not None:
+            mapping[f"{key}_minutes"] = col
+    return mapping
+
+
+def check_mapping(mapping):
+    """Raise ``ValueError`` naming every input the export cannot provide."""
+    available = set(mapping)
+    if "minutes_asleep" in available:
+        available.add("sleep_duration")
+    if "sleep_duration" in available or "minutes_asleep" in available:
+        available.update(k for k in STAGE_MINUTE_COLUMNS if f"{k}_minutes" in mapping)
+    errors = []
+    if "date" not in available:
+        errors.append(f"no date column (one of {list(DATE_COLUMNS)})")
+    for name in MODEL_NAMES:
+        missing = [k for k in raw_inputs(name) if k not in available]
+        if missing:
+            errors.append(f"missing inputs for {name} model: {missing}")
+    if errors:
+        raise ValueError("; ".join(errors))
+
+
+def normalize_chunk(raw, mapping):
+    """Page inputs (clipped to their ranges) plus a ``timestamp`` column."""
+    import pandas as pd
+
+    def column(key):
+        return pd.to_numeric(raw[mapping[key]], errors="coerce")
+
+    df = pd.DataFrame(index=raw.index)
+    dates = pd.to_datetime(raw[mapping["date"]], errors="coerce")
+    df["timestamp"] = dates.dt.strftime(history_store.TIMESTAMP_FORMAT)
+    for key in SOURCE_COLUMNS:
+        if key in mapping:
+            df[key] = column(key)
+
+    if "minutes_asleep" in mapping:
+        hours = column("minutes_asleep") / 60
+        if "sleep_duration" in df:
+            hours = df["sleep_duration"].fillna(hours)
+        df["sleep_duration"] = hours
+    for key in STAGE_MINUTE_COLUMNS:
+        if f"{key}_minutes" in mapping:
+            ratio = column(f"{key}_minutes") / (df["sleep_duration"] * 60)
+            ratio = ratio.replace([np.inf, -np.inf], np.nan)
+            if key in df:
+                ratio = df[key].fillna(ratio)
+            df[key] = ratio
+
+    for key in _NEEDED:
+        lo, hi, is_int = INPUT_RANGES[key]
+        values = df[key].clip(lo, hi)
+        df[key] = values.round() if is_int else values
+    return df[["timestamp", *_NEEDED]]
+
+
+# --------------------------------------------------
+# IMPORT
+# --------------------------------------------------
+def _existing_days(username, days):
+    """Days among ``days`` (``YYYY-MM-DD``) with any record for ``username``,
+    whatever its time of day."""
+    if len(days) == 0:
+        return set()
+    end = (np.datetime64(max(days)) + np.timedelta64(1, "D")).astype(str)
+    existing = history_store.load_history(
+        username, min(days), end, columns=["timestamp"]
+    )
+    return set(existing["timestamp"].str[:10])
+
+
+def import_export(source, username, chunksize=DEFAULT_CHUNKSIZE, fmt=None, on_chunk=None):
+    """Score and save every day in ``source`` (a path or file object) for
+    ``username``; returns counts of rows read, imported and skipped."""
+    models = {name: inference.get_model(name) for name in MODEL_NAMES}
+    # The same models score every chunk, even if a new version is swapped in.
+    model_version = version_label({name: m.version for name, m in models.items()})
+    stats = {
+        "read": 0,
+        "imported": 0,
+        "skipped_invalid": 0,
+        "skipped_duplicate": 0,
+        "skipped_existing": 0,
+    }
+    mapping = None
+    for raw in iter_raw_chunks(source, chunksize, fmt):
+        if mapping is None:
+            mapping = column_mapping(raw.columns)
+            check_mapping(mapping)
+        stats["read"] += len(raw)
+
+        df = normalize_chunk(raw, mapping).dropna()
+        stats["skipped_invalid"] += len(raw) - len(df)
+        days = df["timestamp"].str[:10]
+        unique = df[~days.duplicated(keep="last")]
+        stats["skipped_duplicate"] += len(df) - len(unique)
+        existing = _existing_days(username, days.unique().tolist())
+        fresh = unique[~unique["timestamp"].str[:10].isin(existing)]
+        stats["skipped_existing"] += len(unique) - len(fresh)
+        if len(fresh):
+            fresh = inference.add_derived_features(fresh)
+            scores = {
+                OUTPUT_COLUMNS[name]: model.predict(fresh) for name, model in models.items()
+            }
+            rows = [
+                history_store.make_row(username, s, sl, c, ts, model_version)
+                for ts, s, sl, c in zip(
+                    fresh["timestamp"], scores["stress"], scores["sleep"], scores["calories"]
+                )
+            ]
+            history_store.save_history_many(rows)
+            stats["imported"] += len(rows)
+        if on_chunk is not None:
+            on_chunk(stats)
+    return stats
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m intellihealth.importer",
+        description="Import a wearable export into a user's scored health history.",
+    )
+    parser.add_argument("input", help="CSV, JSON array or JSON Lines export")
+    parser.add_argument("--user", required=True, help="History owner")
+    parser.add_argument(
+        "--format", choices=["csv", "json"], help="Default: from the file extension"
+    )
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    stats = import_export(args.input, args.user, args.chunksize, args.format)
+    print(
+        f"Read {stats['read']} rows: imported {stats['imported']}, skipped "
+        f"{stats['skipped_invalid']} incomplete, {stats['skipped_duplicate']} repeated "
+        f"days and {stats['skipped_existing']} already saved"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,636 @@
+"""Headless scoring for the stress, sleep and calorie models.
+
+Usable as a library::
+
+    from intellihealth import inference
+    models = inference.load_models()
+    scored = inference.score_frame(df, models)
+
+or from the command line to score large CSV / Parquet files in chunks::
+
+    python -m intellihealth.inference wearables.csv scored.csv --workers 4
+
+Input columns may use either the model feature names stored in
+``<model>_features.pkl`` or the page input names from
+``intellihealth.schema.MODEL_INPUTS``.  ``minutes_asleep`` and
+``sleep_light_ratio`` are derived exactly as on the Sleep page when they
+are not present.  Parquet support needs the optional ``pyarrow`` package.
+"""
+
+import argparse
+import os
+import threading
+import time
+import warnings
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from intellihealth import metrics, registry
+from intellihealth.cache import PredictionCache
+from intellihealth.forest import CompiledEnsemble, compile_ensemble, compiled_path, load_compiled
+from intellihealth.schema import (
+    MODEL_INPUTS,
+    MODEL_NAMES,
+    OUTPUT_COLUMNS,
+    derive_minutes_asleep,
+    derive_sleep_light_ratio,
+    input_decimals,
+    sweep_rows,
+)
+
+ARTIFACT_DIR = os.environ.get(
+    "INTELLIHEALTH_ARTIFACT_DIR",
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+)
+
+# Prefer <model>_model.compiled/ (see intellihealth.forest) over the pickle.
+USE_COMPILED = os.environ.get("INTELLIHEALTH_USE_COMPILED", "1") != "0"
+
+# Batches of more rows than this go to the pickled scikit-learn estimator,
+# whose compiled traversal beats the NumPy walk once per-call overhead is
+# amortised (see ``python -m benchmarks.run --only models``).  The pickle
+# is loaded on the first such batch.  0 keeps every batch on the arrays.
+COMPILED_MAX_ROWS = int(os.environ.get("INTELLIHEALTH_COMPILED_MAX_ROWS", "256"))
+
+# Serve <model>_model.<variant>.compiled/ (see intellihealth.compress) instead.
+MODEL_VARIANT = os.environ.get("INTELLIHEALTH_MODEL_VARIANT") or None
+
+# Single-row prediction cache per model (0 disables it).  Keys are rounded
+# to widget precision unless INTELLIHEALTH_CACHE_QUANTIZE=0.
+PREDICTION_CACHE_SIZE = int(os.environ.get("INTELLIHEALTH_PREDICTION_CACHE_SIZE", "1024"))
+CACHE_QUANTIZE = os.environ.get("INTELLIHEALTH_CACHE_QUANTIZE", "1") != "0"
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def artifact_path(filename, directory=None):
+    return os.path.join(directory or ARTIFACT_DIR, filename)
+
+
+# --------------------------------------------------
+# MODEL LOADING
+# --------------------------------------------------
+_quiet_lock = threading.Lock()
+_quiet = False
+
+
+def _quiet_feature_names():
+    """Silence scikit-learn's "X does not have valid feature names" warning.
+
+    Registered once per process, when the first Model wraps an estimator
+    fitted on a DataFrame; ``Model`` checks the names itself and then
+    hands the estimator plain arrays.
+    """
+    global _quiet
+    with _quiet_lock:
+        if not _quiet:
+            warnings.filterwarnings(
+                "ignore",
+                message="X does not have valid feature names",
+                category=UserWarning,
+                module=r"sklearn\.",
+            )
+            _quiet = True
+
+
+class Model:
+    """A loaded estimator plus the feature order it expects.
+
+    Feature names are checked against the fitted estimator once, here, so
+    prediction can hand plain NumPy arrays to the estimator without
+    building a DataFrame per call.
+
+    ``batch_source`` is the pickle a compiled ``estimator`` was built
+    from; batches over ``COMPILED_MAX_ROWS`` rows are predicted with it.
+    """
+
+    def __init__(self, name, estimator, features, version=None, batch_source=None):
+        if len(features) != len(MODEL_INPUTS[name]):
+            raise ValueError(
+                f"{name}_features.pkl lists {len(features)} features, "
+                f"expected {len(MODEL_INPUTS[name])}"
+            )
+        fitted = getattr(estimator, "feature_names_in_", None)
+        if fitted is not None and [str(f) for f in fitted] != [str(f) for f in features]:
+            raise ValueError(
+                f"{name}_features.pkl does not match the columns "
+                f"{name}_model was fitted on"
+            )
+        if fitted is not None and not isinstance(estimator, CompiledEnsemble):
+            _quiet_feature_names()
+        self.name = name
+        self.estimator = estimator
+        self.features = list(features)
+        self.version = version
+        self._local = threading.local()
+        self._explainer = None
+        self._batch_source = batch_source
+        self._batch_estimator = None
+        self._batch_lock = threading.Lock()
+
+    def _row_buffer(self):
+        # One preallocated (1, n_features) row per thread; sessions run on
+        # separate threads and must not share it.
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = self._local.row = np.empty((1, len(self.features)))
+        return row
+
+    def _for_batch(self, n_rows):
+        """The estimator to predict ``n_rows`` rows with."""
+        if self._batch_source is None or not COMPILED_MAX_ROWS or n_rows <= COMPILED_MAX_ROWS:
+            return self.estimator
+        if self._batch_estimator is None:
+            with self._batch_lock:
+                if self._batch_estimator is None:
+                    import joblib
+
+                    with metrics.span("load_batch_estimator", model=self.name):
+                        estimator = joblib.load(self._batch_source)
+                    if getattr(estimator, "feature_names_in_", None) is not None:
+                        _quiet_feature_names()
+                    self._batch_estimator = estimator
+        return self._batch_estimator
+
+    def predict(self, df):
+        with metrics.span("feature_frame", model=self.name):
+            X = feature_matrix(self, df)
+        with metrics.span("predict", model=self.name):
+            return self._for_batch(len(X)).predict(X)
+
+    def predict_rows(self, rows):
+        """Predict rows whose values are already in ``self.features`` order."""
+        with metrics.span("feature_frame", model=self.name):
+            X = np.asarray(rows, dtype=float)
+        with metrics.span("predict", model=self.name):
+            return self._for_batch(len(X)).predict(X)
+
+    def predict_row(self, values):
+        with metrics.span("feature_frame", model=self.name):
+            X = self._row_buffer()
+            X[0] = values
+        with metrics.span("predict", model=self.name):
+            return float(self.estimator.predict(X)[0])
+
+    def explain_row(self, values):
+        """``(bias, contributions)`` for one row in feature order, with
+        ``bias + sum(contributions)`` equal to the prediction."""
+        if self._explainer is None:
+            # A pickled estimator is flattened once, on its first explanation.
+            self._explainer = (
+                self.estimator
+                if isinstance(self.estimator, CompiledEnsemble)
+                else compile_ensemble(self.estimator)
+            )
+        with metrics.span("explain", model=self.name):
+            bias, contributions = self._explainer.contributions([values])
+        return bias, contributions[0]
+
+
+# joblib (and scikit-learn, on unpickling) and pandas are imported where
+# they are used, so a prediction page served from compiled models loads
+# neither of them up front.
+def load_features(name, directory=None):
+    import joblib
+
+    return list(joblib.load(artifact_path(f"{name}_features.pkl", directory)))
+
+
+def load_estimator(name, directory=None):
+    """The compiled flat-array form of a model when available, else the pickle."""
+    pkl = artifact_path(f"{name}_model.pkl", directory)
+    if MODEL_VARIANT:
+        compiled = load_compiled(pkl, MODEL_VARIANT)
+        if compiled is not None:
+            return compiled
+        warnings.warn(
+            f"No up-to-date {MODEL_VARIANT!r} variant of {name}_model.pkl; "
+            "using the full model (run 'python -m intellihealth.compress build')"
+        )
+    if USE_COMPILED:
+        compiled = load_compiled(pkl)
+        if compiled is not None:
+            return compiled
+    import joblib
+
+    return joblib.load(pkl)
+
+
+def load_model(name, directory=None, version=None):
+    """``name`` from ``directory`` (default ``ARTIFACT_DIR``), tagged ``version``."""
+    pkl = artifact_path(f"{name}_model.pkl", directory)
+    estimator = load_estimator(name, directory)
+    # Variants are approximations, so they serve every batch themselves.
+    exact = isinstance(estimator, CompiledEnsemble) and not MODEL_VARIANT
+    return Model(
+        name,
+        estimator,
+        load_features(name, directory),
+        version,
+        batch_source=pkl if exact and os.path.exists(pkl) else None,
+    )
+
+
+def artifact_signature(name, directory=None):
+    """Size and mtime of every file a loaded model depends on."""
+    pkl = artifact_path(f"{name}_model.pkl", directory)
+    paths = [
+        pkl,
+        artifact_path(f"{name}_features.pkl", directory),
+        os.path.join(compiled_path(pkl), "meta.json"),
+        os.path.join(compiled_path(pkl, MODEL_VARIANT), "meta.json"),
+    ]
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_size, st.st_mtime_ns))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def load_models(names=MODEL_NAMES):
+    return {name: load_model(name) for name in names}
+
+
+# --------------------------------------------------
+# LAZY, PREFETCHABLE MODEL HANDLES
+# --------------------------------------------------
+def unversioned_label():
+    """Version recorded for models loaded straight from ``ARTIFACT_DIR``: a
+    digest of every model's artifact signature, shared until one changes."""
+    signature = tuple(artifact_signature(name) for name in MODEL_NAMES)
+    return f"unversioned-{zlib.crc32(repr(signature).encode()):08x}"
+
+
+class LazyModel:
+    """Process-wide handle that loads its model on first ``get()``.
+
+    With a model registry (``intellihealth.registry``) the first load takes
+    the registry's current version and later versions are swapped in by its
+    watcher.  Otherwise the model is reloaded whenever one of its artifact
+    files in ``ARTIFACT_DIR`` changes on disk.
+
+    Prediction cache entries are keyed by model version, so a prediction
+    still running on a replaced model cannot leave a stale entry behind.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._model = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._prefetch = None
+        self.cache = PredictionCache(
+            maxsize=PREDICTION_CACHE_SIZE,
+            decimals=input_decimals(name) if CACHE_QUANTIZE else None,
+        )
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    @property
+    def version(self):
+        model = self._model
+        return model.version if model is not None else None
+
+    def get(self):
+        model = self._model
+        if model is not None and (
+            registry.MODEL_REGISTRY or self._signature == artifact_signature(self.name)
+        ):
+            return model
+        # A concurrent prefetch holds the lock while loading, so callers
+        # simply wait for it instead of loading a second copy.
+        with self._lock:
+            if registry.MODEL_REGISTRY:
+                if self._model is None:
+                    version = registry.current_version()
+                    if version is None:
+                        raise FileNotFoundError(
+                            f"No model versions in {registry.MODEL_REGISTRY}"
+                        )
+                    self._model = registry.load_version(self.name, version)
+                return self._model
+            signature = artifact_signature(self.name)
+            if self._model is None or self._signature != signature:
+                reloading = self._model is not None
+                with metrics.span("load_artifacts", model=self.name):
+                    self._model = load_model(self.name, version=unversioned_label())
+                self._signature = signature
+                if reloading:
+                    self.cache.clear()
+            return self._model
+
+    def swap(self, model):
+        """Serve ``model`` from now on; callers holding the old one finish with it."""
+        with self._lock:
+            self._model = model
+        self.cache.clear()
+
+    def predict_row_versioned(self, row):
+        """``(prediction, model version)``; ``row`` is in feature order."""
+        model = self.get()
+        key = (model.version, self.cache.key(row))
+        return self.cache.lookup(key, lambda k: model.predict_row(k[1])), model.version
+
+    def predict_row(self, row):
+        """Cached single-row prediction; ``row`` is in feature order."""
+        return self.predict_row_versioned(row)[0]
+
+    def explain_row(self, row):
+        """Per-feature contributions to ``predict_row(row)``: ``(bias, array)``."""
+        # Same rounding as the cache, so the parts add up to the shown score.
+        return self.get().explain_row(self.cache.key(row))
+
+
+_handles = {name: LazyModel(name) for name in MODEL_NAMES}
+_prefetch_pool = None
+_prefetch_lock = threading.Lock()
+
+
+def model_handle(name):
+    return _handles[name]
+
+
+def get_model(name):
+    return _handles[name].get()
+
+
+def sweep(name, row, key, points=200):
+    """``(values, predictions)`` for ``row`` with input ``key`` swept over its
+    range, scored in one batched ``predict``."""
+    values, rows = sweep_rows(name, row, key, points)
+    return values, get_model(name).predict_rows(rows)
+
+
+_predict_pool = None
+
+
+def predict_all(rows, versions=None):
+    """Predict ``{model: row}`` concurrently; returns ``{model: prediction}``.
+
+    If given, the dict ``versions`` receives the version of each model used.
+    """
+    global _predict_pool
+    with _prefetch_lock:
+        if _predict_pool is None:
+            _predict_pool = ThreadPoolExecutor(
+                max_workers=len(MODEL_NAMES), thread_name_prefix="predict"
+            )
+    futures = {
+        name: _predict_pool.submit(_handles[name].predict_row_versioned, row)
+        for name, row in rows.items()
+    }
+    results = {name: future.result() for name, future in futures.items()}
+    if versions is not None:
+        versions.update({name: version for name, (_, version) in results.items()})
+    return {name: prediction for name, (prediction, _) in results.items()}
+
+
+def cache_stats():
+    return {name: handle.cache.stats() for name, handle in _handles.items()}
+
+
+def _cache_metrics():
+    stats = cache_stats()
+    return [
+        (
+            f"prediction_cache_{key}_total",
+            "counter",
+            f"Prediction cache {key}.",
+            [({"model": name}, s[key]) for name, s in stats.items()],
+        )
+        for key in ("hits", "misses", "evictions", "invalidations")
+    ] + [
+        (
+            "prediction_cache_size",
+            "gauge",
+            "Entries in the prediction cache.",
+            [({"model": name}, s["size"]) for name, s in stats.items()],
+        )
+    ]
+
+
+metrics.register_collector(_cache_metrics)
+
+
+def prefetch(names=MODEL_NAMES):
+    """Start loading ``names`` on background threads; returns immediately."""
+    global _prefetch_pool
+    with _prefetch_lock:
+        for name in names:
+            handle = _handles[name]
+            if handle.loaded or handle._prefetch is not None:
+                continue
+            if _prefetch_pool is None:
+                _prefetch_pool = ThreadPoolExecutor(
+                    max_workers=len(MODEL_NAMES), thread_name_prefix="model-prefetch"
+                )
+            # A failed prefetch is retried (and raised) by the next get().
+            handle._prefetch = _prefetch_pool.submit(handle.get)
+
+
+# --------------------------------------------------
+# FEATURE CONSTRUCTION
+# --------------------------------------------------
+def add_derived_features(df):
+    derived = {}
+    if "minutes_asleep" not in df.columns and "sleep_duration" in df.columns:
+        derived["minutes_asleep"] = derive_minutes_asleep(df["sleep_duration"])
+    if (
+        "sleep_light_ratio" not in df.columns
+        and "deep" in df.columns
+        and "rem" in df.columns
+    ):
+        derived["sleep_light_ratio"] = derive_sleep_light_ratio(df["deep"], df["rem"])
+    return df.assign(**derived) if derived else df
+
+
+def input_columns(model, columns):
+    """Source column in ``columns`` for each of ``model.features``."""
+    resolved = []
+    missing = []
+    for feature, key in zip(model.features, MODEL_INPUTS[model.name]):
+        if feature in columns:
+            resolved.append(feature)
+        elif key in columns:
+            resolved.append(key)
+        else:
+            missing.append(key)
+    if missing:
+        raise ValueError(f"Missing inputs for {model.name} model: {missing}")
+    return resolved
+
+
+def feature_matrix(model, df):
+    return df[input_columns(model, df.columns)].to_numpy(dtype=float)
+
+
+def feature_frame(model, df):
+    import pandas as pd
+
+    return pd.DataFrame(feature_matrix(model, df), columns=model.features, index=df.index)
+
+
+def score_frame(df, models):
+    """Return ``df`` with one prediction column per model appended."""
+    df = add_derived_features(df)
+    return df.assign(
+        **{OUTPUT_COLUMNS[name]: model.predict(df) for name, model in models.items()}
+    )
+
+
+# --------------------------------------------------
+# CHUNKED FILE I/O
+# --------------------------------------------------
+def _is_parquet(path):
+    return path.lower().endswith((".parquet", ".pq"))
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Parquet support requires the 'pyarrow' package") from exc
+    return pyarrow
+
+
+def iter_chunks(path, chunksize=DEFAULT_CHUNKSIZE):
+    if _is_parquet(path):
+        pa = _require_pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+class ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._started = False
+
+    def write(self, df):
+        if _is_parquet(self.path):
+            pa = _require_pyarrow()
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pa.parquet.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            df.to_csv(
+                self.path,
+                mode="a" if self._started else "w",
+                header=not self._started,
+                index=False,
+            )
+        self._started = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --------------------------------------------------
+# PROCESS POOL
+# --------------------------------------------------
+_worker_models = None
+
+
+def _init_worker(names):
+    global _worker_models
+    _worker_models = load_models(names)
+
+
+def _score_chunk(df):
+    return score_frame(df, _worker_models)
+
+
+def _ordered_map(pool, fn, items, max_pending):
+    pending = deque()
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def score_file(
+    input_path,
+    output_path,
+    names=MODEL_NAMES,
+    chunksize=DEFAULT_CHUNKSIZE,
+    workers=0,
+):
+    """Score ``input_path`` chunk by chunk; returns the number of rows."""
+    rows = 0
+    chunks = iter_chunks(input_path, chunksize)
+    with ChunkWriter(output_path) as writer:
+        if workers > 1:
+            with ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(tuple(names),)
+            ) as pool:
+                for scored in _ordered_map(pool, _score_chunk, chunks, 2 * workers):
+                    writer.write(scored)
+                    rows += len(scored)
+        else:
+            models = load_models(names)
+            for chunk in chunks:
+                scored = score_frame(chunk, models)
+                writer.write(scored)
+                rows += len(scored)
+    return rows
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m intellihealth.inference",
+        description="Batch-score a CSV or Parquet file with the IntelliHealth models.",
+    )
+    parser.add_argument("input", help="CSV or Parquet file to score")
+    parser.add_argument("output", help="CSV or Parquet file to write")
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        choices=MODEL_NAMES,
+        default=list(MODEL_NAMES),
+        help="Models to run (default: all)",
+    )
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Score chunks in a pool of this many processes",
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rows = score_file(
+        args.input, args.output, args.models, args.chunksize, args.workers
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Scored {rows} rows in {elapsed:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
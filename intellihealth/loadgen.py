@@ -0,0 +1,109 @@
+"""Load generator for ``intellihealth.server``.
+
+Opens ``--concurrency`` keep-alive connections, each sending requests
+back to back for ``--duration`` seconds with random inputs drawn from the
+page input ranges, then reports throughput and latency percentiles::
+
+    python -m intellihealth.loadgen --port 8000 --model stress --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from intellihealth.schema import MODEL_NAMES, random_inputs
+
+
+def _payloads(name, n, seed):
+    columns = random_inputs(name, n, seed)
+    return [
+        json.dumps({key: float(values[i]) for key, values in columns.items()}).encode()
+        for i in range(n)
+    ]
+
+
+async def _client(host, port, path, payloads, stop_at, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    try:
+        while time.perf_counter() < stop_at:
+            body = payloads[i % len(payloads)]
+            i += 1
+            start = time.perf_counter()
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                if key.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(host, port, name, concurrency, duration, seed=0):
+    payloads = _payloads(name, 1000, seed)
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    stop_at = start + duration
+    await asyncio.gather(*(
+        _client(host, port, f"/predict/{name}", payloads, stop_at, latencies, errors)
+        for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    ms = np.asarray(latencies) * 1000
+    return {
+        "model": name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)) if len(ms) else None,
+        "p99_ms": float(np.percentile(ms, 99)) if len(ms) else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m intellihealth.loadgen",
+        description="Measure throughput and latency of intellihealth.server.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", choices=MODEL_NAMES, default="stress")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(
+        run(args.host, args.port, args.model, args.concurrency, args.duration)
+    )
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(
+            f"{result['model']}: {result['requests']} requests, "
+            f"{result['errors']} errors, {result['rps']:.0f} req/s, "
+            f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
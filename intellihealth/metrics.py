@@ -0,0 +1,197 @@
+"""Lightweight hot-path instrumentation.
+
+Code wraps each stage in ``with metrics.span("stage", model="stress"):``.
+Spans feed per-stage latency histograms; other modules register
+collectors for counters such as prediction-cache hits.
+
+Metrics are off unless one of these is set:
+
+* ``INTELLIHEALTH_METRICS_PORT`` - serve Prometheus text format on
+  ``http://0.0.0.0:<port>/metrics`` from a daemon thread.
+* ``INTELLIHEALTH_METRICS_FILE`` - append a snapshot in the same format to
+  this rotating file every ``INTELLIHEALTH_METRICS_INTERVAL`` seconds
+  (default 15).
+
+When disabled, ``span()`` returns one shared no-op context manager, so the
+instrumented code pays a single function call per stage.
+"""
+
+import bisect
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "intellihealth"
+
+# Seconds; chosen to separate cached reruns from CSV I/O and cold loads.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+PORT = os.environ.get("INTELLIHEALTH_METRICS_PORT")
+FILE = os.environ.get("INTELLIHEALTH_METRICS_FILE")
+INTERVAL = float(os.environ.get("INTELLIHEALTH_METRICS_INTERVAL", "15"))
+
+ENABLED = bool(PORT or FILE)
+
+_NOOP = nullcontext()
+
+
+# --------------------------------------------------
+# HISTOGRAMS
+# --------------------------------------------------
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+
+_lock = threading.Lock()
+_histograms = {}
+_collectors = []
+
+
+def _labels(stage, labels):
+    return (("stage", stage),) + tuple(sorted(labels.items()))
+
+
+def observe(stage, seconds, **labels):
+    key = _labels(stage, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(seconds)
+
+
+class _Span:
+    __slots__ = ("stage", "labels", "start")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, time.perf_counter() - self.start, **self.labels)
+
+
+def span(stage, **labels):
+    if not ENABLED:
+        return _NOOP
+    return _Span(stage, labels)
+
+
+def register_collector(fn):
+    """``fn()`` returns ``[(name, type, help, [(labels_dict, value), ...])]``."""
+    _collectors.append(fn)
+
+
+# --------------------------------------------------
+# PROMETHEUS TEXT FORMAT
+# --------------------------------------------------
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(pairs):
+    if not pairs:
+        return ""
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + inner + "}"
+
+
+def render():
+    lines = []
+    name = f"{PREFIX}_stage_seconds"
+    lines.append(f"# HELP {name} Time spent in each instrumented stage.")
+    lines.append(f"# TYPE {name} histogram")
+    with _lock:
+        histograms = {k: (list(h.counts), h.sum, h.count) for k, h in _histograms.items()}
+    for labels, (counts, total, count) in sorted(histograms.items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), counts):
+            cumulative += n
+            lines.append(
+                f"{name}_bucket{_fmt_labels(labels + (('le', bound),))} {cumulative}"
+            )
+        lines.append(f"{name}_sum{_fmt_labels(labels)} {total}")
+        lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+
+    for collector in _collectors:
+        for metric, kind, help_text, samples in collector():
+            full = f"{PREFIX}_{metric}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            for labels, value in samples:
+                lines.append(f"{full}{_fmt_labels(sorted(labels.items()))} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# --------------------------------------------------
+# EXPORTERS
+# --------------------------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _write_snapshots(path, interval):
+    logger = logging.getLogger(f"{PREFIX}.metrics")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(
+        logging.handlers.RotatingFileHandler(path, maxBytes=10_000_000, backupCount=3)
+    )
+    while True:
+        time.sleep(interval)
+        logger.info("# snapshot %s\n%s", time.strftime("%Y-%m-%dT%H:%M:%S"), render())
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def start():
+    """Start the configured exporters once per process (no-op if disabled)."""
+    global _started
+    if not ENABLED or _started:
+        return
+    with _start_lock:
+        if _started:
+            return
+        if PORT:
+            server = ThreadingHTTPServer(("0.0.0.0", int(PORT)), _MetricsHandler)
+            threading.Thread(
+                target=server.serve_forever, name="metrics-http", daemon=True
+            ).start()
+        if FILE:
+            threading.Thread(
+                target=_write_snapshots,
+                args=(FILE, INTERVAL),
+                name="metrics-file",
+                daemon=True,
+            ).start()
+        _started = True
@@ -0,0 +1,324 @@
+"""Versioned model artifacts with hot reload.
+
+When ``INTELLIHEALTH_MODEL_REGISTRY`` points at a directory, models are
+served from its version subdirectories instead of ``ARTIFACT_DIR``::
+
+    models/
+        CURRENT             # optional: name of the version to serve
+        2025-06-01/         # stress_model.pkl, stress_features.pkl, ...
+        2025-07-15/
+
+Without ``CURRENT`` the last version in natural sort order is served.
+Version directories are treated as immutable: publish a new one rather
+than editing files in place.
+
+A background watcher (``start_watcher``) polls the registry.  When the
+current version changes, it loads each model of the new version off the
+request path.  It checks the feature list against the fitted model and
+predicts a synthetic batch, which must come back finite.  Only then does
+it swap the model into its ``inference.LazyModel`` handle.  A prediction
+that already holds the old model finishes with it.  A version that fails
+to load or validate is reported and skipped, and the old one keeps
+serving.
+
+    python -m intellihealth.registry list
+    python -m intellihealth.registry publish 2025-07-15 --from retrained/ --activate
+    python -m intellihealth.registry activate 2025-06-01     # roll back
+"""
+
+import argparse
+import os
+import re
+import shutil
+import threading
+import warnings
+
+import numpy as np
+
+from intellihealth import metrics
+from intellihealth.schema import (
+    MODEL_INPUTS,
+    MODEL_NAMES,
+    derive_minutes_asleep,
+    derive_sleep_light_ratio,
+    random_inputs,
+)
+
+MODEL_REGISTRY = os.environ.get("INTELLIHEALTH_MODEL_REGISTRY") or None
+POLL_SECONDS = float(os.environ.get("INTELLIHEALTH_MODEL_POLL_SECONDS", "5"))
+WARMUP_ROWS = 256
+
+CURRENT_FILE = "CURRENT"
+
+_watcher = None
+_watcher_lock = threading.Lock()
+_stop = threading.Event()
+_failed = {}
+_swaps = {name: 0 for name in MODEL_NAMES}
+_failures = {name: 0 for name in MODEL_NAMES}
+
+
+# --------------------------------------------------
+# VERSIONS
+# --------------------------------------------------
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def versions(root=MODEL_REGISTRY):
+    """Published versions, oldest first."""
+    if not root or not os.path.isdir(root):
+        return []
+    return sorted(
+        (
+            d for d in os.listdir(root)
+            if not d.startswith(".") and os.path.isdir(os.path.join(root, d))
+        ),
+        key=_natural_key,
+    )
+
+
+def current_version(root=MODEL_REGISTRY):
+    """The version named in ``CURRENT``, else the latest one, else None."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            version = f.read().strip()
+        if version:
+            return version
+    except (OSError, TypeError):
+        pass
+    published = versions(root)
+    return published[-1] if published else None
+
+
+def version_dir(version, root=MODEL_REGISTRY):
+    return os.path.join(root, version)
+
+
+def version_label(model_versions):
+    """One string for the versions behind a set of predictions.
+
+    ``{"stress": "v2", "sleep": "v2"}`` gives ``"v2"``; mixed versions give
+    ``"stress=v2,sleep=v3"``.
+    """
+    present = {name: v for name, v in model_versions.items() if v is not None}
+    if not present:
+        return None
+    if len(set(present.values())) == 1:
+        return next(iter(present.values()))
+    return ",".join(f"{name}={present[name]}" for name in MODEL_NAMES if name in present)
+
+
+# --------------------------------------------------
+# LOADING AND VALIDATION
+# --------------------------------------------------
+def warm_up(model, rows=WARMUP_ROWS):
+    """Predict a synthetic batch within the page ranges; raises ``ValueError``
+    if the model returns the wrong shape or non-finite values."""
+    columns = random_inputs(model.name, rows)
+    if "sleep_duration" in columns:
+        columns["minutes_asleep"] = derive_minutes_asleep(columns["sleep_duration"])
+    if "deep" in columns and "rem" in columns:
+        columns["sleep_light_ratio"] = derive_sleep_light_ratio(columns["deep"], columns["rem"])
+    X = np.column_stack([columns[key] for key in MODEL_INPUTS[model.name]])
+    predictions = np.asarray(model.predict_rows(X))
+    if predictions.shape != (rows,) or not np.isfinite(predictions).all():
+        raise ValueError(f"{model.name} model returned invalid predictions on warm-up")
+    model.predict_row(X[0])
+
+
+def load_version(name, version, root=MODEL_REGISTRY):
+    """Load, validate and warm up model ``name`` of ``version``."""
+    from intellihealth import inference
+
+    directory = version_dir(version, root)
+    with metrics.span("load_artifacts", model=name):
+        # Model() checks the feature list against the fitted estimator.
+        model = inference.load_model(name, directory, version)
+    warm_up(model)
+    return model
+
+
+# --------------------------------------------------
+# WATCHER
+# --------------------------------------------------
+def poll(root=MODEL_REGISTRY):
+    """Swap every loaded model whose version is not the current one;
+    returns ``{name: version}`` for the models swapped."""
+    from intellihealth import inference
+
+    version = current_version(root)
+    swapped = {}
+    if version is None:
+        return swapped
+    for name in MODEL_NAMES:
+        handle = inference.model_handle(name)
+        if not handle.loaded or handle.version == version or _failed.get(name) == version:
+            continue
+        try:
+            model = load_version(name, version, root)
+        except Exception as exc:
+            # Retried only once CURRENT moves to another version.
+            _failed[name] = version
+            _failures[name] += 1
+            warnings.warn(f"Keeping {name} model {handle.version!r}: {version!r} failed: {exc}")
+            continue
+        handle.swap(model)
+        _failed.pop(name, None)
+        _swaps[name] += 1
+        swapped[name] = version
+    return swapped
+
+
+def _watch(root, interval):
+    while not _stop.wait(interval):
+        try:
+            poll(root)
+        except Exception as exc:
+            warnings.warn(f"Model registry poll failed: {exc}")
+
+
+def start_watcher(root=MODEL_REGISTRY, interval=POLL_SECONDS):
+    """Start polling ``root`` on a daemon thread, once per process."""
+    global _watcher
+    if not root:
+        return
+    with _watcher_lock:
+        if _watcher is not None:
+            return
+        _stop.clear()
+        _watcher = threading.Thread(
+            target=_watch, args=(root, interval), name="model-registry", daemon=True
+        )
+        _watcher.start()
+
+
+def stop_watcher():
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            return
+        _stop.set()
+        _watcher.join()
+        _watcher = None
+
+
+def _registry_metrics():
+    from intellihealth import inference
+
+    return [
+        (
+            "model_version_info",
+            "gauge",
+            "Model version being served.",
+            [
+                ({"model": name, "version": inference.model_handle(name).version}, 1)
+                for name in MODEL_NAMES
+                if inference.model_handle(name).loaded
+            ],
+        ),
+        (
+            "model_swaps_total",
+            "counter",
+            "Hot reloads of a new model version.",
+            [({"model": name}, n) for name, n in _swaps.items()],
+        ),
+        (
+            "model_swap_failures_total",
+            "counter",
+            "Model versions rejected by validation or warm-up.",
+            [({"model": name}, n) for name, n in _failures.items()],
+        ),
+    ]
+
+
+metrics.register_collector(_registry_metrics)
+
+
+# --------------------------------------------------
+# PUBLISHING
+# --------------------------------------------------
+def _is_artifact(filename):
+    return any(filename.startswith(f"{name}_") for name in MODEL_NAMES) and (
+        filename.endswith(("_model.pkl", "_features.pkl", ".compiled"))
+    )
+
+
+def publish(source, version, root=MODEL_REGISTRY, activate=False):
+    """Copy the model artifacts in ``source`` into a new version, after
+    loading and warming up each model from the copy."""
+    target = version_dir(version, root)
+    if os.path.exists(target):
+        raise FileExistsError(f"Version {version!r} already exists in {root}")
+    tmp = os.path.join(root, f".{version}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for filename in os.listdir(source):
+        if not _is_artifact(filename):
+            continue
+        path = os.path.join(source, filename)
+        # copy2 keeps mtimes, so compiled models still match their pickle.
+        if os.path.isdir(path):
+            shutil.copytree(path, os.path.join(tmp, filename))
+        else:
+            shutil.copy2(path, tmp)
+    try:
+        for name in MODEL_NAMES:
+            load_version(name, os.path.basename(tmp), root)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    # Watchers only ever see complete version directories.
+    os.rename(tmp, target)
+    if activate:
+        set_current(version, root)
+
+
+def set_current(version, root=MODEL_REGISTRY):
+    if not os.path.isdir(version_dir(version, root)):
+        raise FileNotFoundError(f"No version {version!r} in {root}")
+    tmp = os.path.join(root, CURRENT_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main(argv=None):
+    from intellihealth.inference import ARTIFACT_DIR
+
+    parser = argparse.ArgumentParser(
+        prog="python -m intellihealth.registry",
+        description="Publish and activate versioned model artifacts.",
+    )
+    parser.add_argument("--root", default=MODEL_REGISTRY or "models")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Show published versions")
+    pub = sub.add_parser("publish", help="Validate and publish a new version")
+    pub.add_argument("version")
+    pub.add_argument("--from", dest="source", default=ARTIFACT_DIR)
+    pub.add_argument("--activate", action="store_true")
+    act = sub.add_parser("activate", help="Serve a published version")
+    act.add_argument("version")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        current = current_version(args.root)
+        for version in versions(args.root):
+            print(f"{'*' if version == current else ' '} {version}")
+    elif args.command == "publish":
+        os.makedirs(args.root, exist_ok=True)
+        try:
+            publish(args.source, args.version, args.root, args.activate)
+        except (FileExistsError, ValueError) as exc:
+            raise SystemExit(f"Not published: {exc}")
+        print(f"Published {args.version} to {args.root}")
+    else:
+        set_current(args.version, args.root)
+        print(f"Serving {args.version} from {args.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""Model inputs as entered on the Stress, Sleep and Calorie pages.
+
+``MODEL_INPUTS`` lists, for each model, the page inputs in the same order
+as the columns in ``<model>_features.pkl``: the app builds its feature
+rows positionally, so position ``i`` here feeds ``features[i]``.
+
+``INPUT_RANGES`` mirrors the ``min``/``max`` of the Streamlit widgets.
+"""
+
+import math
+
+import numpy as np
+
+MODEL_NAMES = ("stress", "sleep", "calorie")
+
+# Column written to health history / batch output for each model.
+OUTPUT_COLUMNS = {
+    "stress": "stress",
+    "sleep": "sleep",
+    "calorie": "calories",
+}
+
+MODEL_INPUTS = {
+    "stress": [
+        "rmssd",
+        "nremhr",
+        "resting_hr",
+        "nightly_temp",
+        "steps",
+        "sedentary",
+        "sleep_duration",
+    ],
+    "sleep": [
+        "sleep_duration",
+        "efficiency",
+        "minutes_asleep",
+        "awake",
+        "deep",
+        "sleep_light_ratio",
+        "rem",
+        "breathing",
+        "nremhr",
+    ],
+    "calorie": [
+        "steps",
+        "distance",
+        "light",
+        "moderate",
+        "vigorous",
+        "sedentary",
+        "bpm",
+        "nremhr",
+        "rmssd",
+        "sleep_duration",
+    ],
+}
+
+# (min, max, is_integer) as enforced by the page widgets.
+INPUT_RANGES = {
+    "rmssd": (10.0, 150.0, False),
+    "nremhr": (40.0, 120.0, False),
+    "resting_hr": (40.0, 120.0, False),
+    "nightly_temp": (30.0, 38.0, False),
+    "steps": (0, 30000, True),
+    "sedentary": (0, 1440, True),
+    "sleep_duration": (0.0, 12.0, False),
+    "efficiency": (0.0, 100.0, False),
+    "deep": (0.0, 1.0, False),
+    "rem": (0.0, 1.0, False),
+    "awake": (0, 300, True),
+    "breathing": (10.0, 25.0, False),
+    "distance": (0.0, 30.0, False),
+    "light": (0, 500, True),
+    "moderate": (0, 300, True),
+    "vigorous": (0, 180, True),
+    "bpm": (40.0, 150.0, False),
+}
+
+# Widget labels used on the pages.
+INPUT_LABELS = {
+    "rmssd": "RMSSD (HRV)",
+    "nremhr": "NREM Heart Rate (bpm)",
+    "resting_hr": "Resting Heart Rate (bpm)",
+    "nightly_temp": "Nightly Temperature (°C)",
+    "steps": "Steps",
+    "sedentary": "Sedentary Minutes",
+    "sleep_duration": "Sleep Duration (hours)",
+    "efficiency": "Sleep Efficiency (%)",
+    "deep": "Deep Sleep Ratio",
+    "rem": "REM Sleep Ratio",
+    "awake": "Minutes Awake",
+    "breathing": "Breathing Rate (breaths/min)",
+    "distance": "Distance (km)",
+    "light": "Light Activity Minutes",
+    "moderate": "Moderate Activity Minutes",
+    "vigorous": "Vigorous Activity Minutes",
+    "bpm": "Average BPM",
+}
+
+# Inputs computed from other inputs rather than entered by the user.
+DERIVED_INPUTS = {
+    "minutes_asleep": ("sleep_duration",),
+    "sleep_light_ratio": ("deep", "rem"),
+}
+
+
+# Union of every model's inputs, and where each model's features sit in it.
+ALL_INPUTS = list(dict.fromkeys(k for name in MODEL_NAMES for k in MODEL_INPUTS[name]))
+INPUT_INDEX = {
+    name: [ALL_INPUTS.index(key) for key in MODEL_INPUTS[name]] for name in MODEL_NAMES
+}
+
+
+def derive_minutes_asleep(sleep_duration):
+    return sleep_duration * 60
+
+
+def derive_sleep_light_ratio(deep, rem):
+    return np.maximum(0.0, 1.0 - (deep + rem))
+
+
+def raw_inputs(name):
+    """Inputs the user actually enters for model ``name``."""
+    needed = []
+    for key in MODEL_INPUTS[name]:
+        for source in DERIVED_INPUTS.get(key, (key,)):
+            if source not in needed:
+                needed.append(source)
+    return needed
+
+
+def checkup_inputs():
+    """Every input a user enters across all three models, entered once."""
+    return [key for key in ALL_INPUTS if key not in DERIVED_INPUTS]
+
+
+def model_rows(values):
+    """Feature rows for all models from one mapping of page inputs."""
+    full = dict(values)
+    full["minutes_asleep"] = derive_minutes_asleep(full["sleep_duration"])
+    full["sleep_light_ratio"] = float(derive_sleep_light_ratio(full["deep"], full["rem"]))
+    vector = [full[key] for key in ALL_INPUTS]
+    return {name: [vector[i] for i in INPUT_INDEX[name]] for name in MODEL_NAMES}
+
+
+def random_inputs(name, n, seed=0):
+    """``n`` random rows (column -> array) within the page input ranges."""
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for key in raw_inputs(name):
+        lo, hi, is_int = INPUT_RANGES[key]
+        if is_int:
+            columns[key] = rng.integers(lo, hi + 1, size=n).astype(float)
+        else:
+            columns[key] = rng.uniform(lo, hi, size=n)
+    return columns
+
+
+def grid_inputs(name, max_rows=100_000):
+    """Evenly spaced grid (column -> array) over the page input ranges.
+
+    Every raw input gets the same number of levels, as many as fit in
+    ``max_rows`` (at least two: the range ends).
+    """
+    keys = raw_inputs(name)
+    levels = max(2, int(max_rows ** (1 / len(keys)) + 1e-9))
+    axes = []
+    for key in keys:
+        lo, hi, is_int = INPUT_RANGES[key]
+        axis = np.linspace(lo, hi, levels)
+        axes.append(np.round(axis) if is_int else axis)
+    mesh = np.meshgrid(*axes, indexing="ij")
+    return {key: m.ravel() for key, m in zip(keys, mesh)}
+
+
+def sweep_rows(name, row, key, points=200):
+    """Copies of ``row`` (feature order) with input ``key`` swept over its range.
+
+    Returns ``(values, rows)``: the ``points`` evenly spaced values of ``key``
+    (whole numbers only for integer inputs) and one feature row per value,
+    with ``minutes_asleep`` / ``sleep_light_ratio`` re-derived to match.
+    """
+    inputs = MODEL_INPUTS[name]
+    lo, hi, is_int = INPUT_RANGES[key]
+    values = np.linspace(lo, hi, points)
+    if is_int:
+        values = np.unique(np.round(values))
+    rows = np.tile(np.asarray(row, dtype=float), (len(values), 1))
+    rows[:, inputs.index(key)] = values
+    if key == "sleep_duration" and "minutes_asleep" in inputs:
+        rows[:, inputs.index("minutes_asleep")] = derive_minutes_asleep(values)
+    if key in ("deep", "rem") and "sleep_light_ratio" in inputs:
+        rows[:, inputs.index("sleep_light_ratio")] = derive_sleep_light_ratio(
+            rows[:, inputs.index("deep")], rows[:, inputs.index("rem")]
+        )
+    return values, rows
+
+
+# Number inputs and sliders on the pages step in hundredths.
+WIDGET_DECIMALS = 2
+
+
+def input_decimals(name):
+    """Widget precision for each input of model ``name``, in feature order."""
+    return [
+        0 if key in INPUT_RANGES and INPUT_RANGES[key][2] else WIDGET_DECIMALS
+        for key in MODEL_INPUTS[name]
+    ]
+
+
+def build_row(name, values):
+    """Validate page inputs in the mapping ``values`` and return the row.
+
+    The row is in ``MODEL_INPUTS[name]`` (i.e. feature) order, with
+    ``minutes_asleep`` and ``sleep_light_ratio`` derived as on the Sleep
+    page.  Raises ``ValueError`` listing every invalid or missing input.
+    """
+    errors = []
+    clean = {}
+    for key in raw_inputs(name):
+        if key not in values:
+            errors.append(f"{key}: missing")
+            continue
+        value = values[key]
+        lo, hi, is_int = INPUT_RANGES[key]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f"{key}: must be a number")
+        elif is_int and value != int(value):
+            errors.append(f"{key}: must be a whole number")
+        elif not lo <= value <= hi:
+            errors.append(f"{key}: must be between {lo} and {hi}")
+        else:
+            clean[key] = float(value)
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    if "minutes_asleep" in MODEL_INPUTS[name]:
+        clean["minutes_asleep"] = derive_minutes_asleep(clean["sleep_duration"])
+    if "sleep_light_ratio" in MODEL_INPUTS[name]:
+        clean["sleep_light_ratio"] = float(
+            derive_sleep_light_ratio(clean["deep"], clean["rem"])
+        )
+    return [clean[key] for key in MODEL_INPUTS[name]]
+
+
+def all_finite(values):
+    """Whether every value is a real number (not ``None``, NaN or infinite)."""
+    return all(v is not None and math.isfinite(v) for v in values)
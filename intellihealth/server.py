@@ -0,0 +1,229 @@
+"""Standalone HTTP inference service.
+
+A small asyncio HTTP/1.1 server (standard library only) exposing::
+
+    POST /predict/stress
+    POST /predict/sleep
+    POST /predict/calorie
+    GET  /health
+
+Each ``POST`` takes a JSON object with the same inputs as the matching
+Streamlit page (see ``intellihealth.schema``), validated against the same
+ranges, and returns ``{"model": ..., "prediction": ..., "model_version": ...}``.
+
+Concurrent requests for a model are coalesced: the first request opens a
+short window (``--batch-window-ms``) and everything that arrives before it
+closes, up to ``--batch-max-rows``, is scored with one vectorized
+``predict`` call on a worker thread.  Models are the same handles the app
+uses (``intellihealth.inference``)::
+
+    python -m intellihealth.server --port 8000
+    python -m intellihealth.loadgen --port 8000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from intellihealth import inference, registry
+from intellihealth.schema import MODEL_NAMES, build_row
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+# --------------------------------------------------
+# MICRO-BATCHING
+# --------------------------------------------------
+class MicroBatcher:
+    def __init__(self, name, executor, window, max_rows):
+        self.name = name
+        self.executor = executor
+        self.window = window
+        self.max_rows = max_rows
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    def _predict(self, rows):
+        # The whole batch is scored by one model, even if a swap happens meanwhile.
+        model = inference.get_model(self.name)
+        return model.predict_rows(rows), model.version
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            rows = [row for row, _ in batch]
+            try:
+                predictions, version = await loop.run_in_executor(
+                    self.executor, self._predict, rows
+                )
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.rows += len(rows)
+            for (_, future), prediction in zip(batch, predictions):
+                if not future.done():
+                    future.set_result((float(prediction), version))
+
+
+# --------------------------------------------------
+# HTTP
+# --------------------------------------------------
+class InferenceServer:
+    def __init__(self, window=0.002, max_rows=64, threads=len(MODEL_NAMES)):
+        self.window = window
+        self.max_rows = max_rows
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="predict")
+        self.batchers = {}
+
+    async def start(self, host, port):
+        for name in MODEL_NAMES:
+            batcher = MicroBatcher(name, self.executor, self.window, self.max_rows)
+            self.batchers[name] = batcher
+            asyncio.get_running_loop().create_task(batcher.run())
+        return await asyncio.start_server(self.handle, host, port)
+
+    async def dispatch(self, method, path, body):
+        if path == "/health" and method == "GET":
+            stats = {
+                name: {
+                    "batches": b.batches,
+                    "rows": b.rows,
+                    "model_version": inference.model_handle(name).version,
+                }
+                for name, b in self.batchers.items()
+            }
+            return HTTPStatus.OK, {"status": "ok", "batching": stats}
+
+        prefix, _, name = path.rpartition("/")
+        if prefix != "/predict" or name not in self.batchers:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint {path}"}
+        if method != "POST":
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Body must be a JSON object")
+            row = build_row(name, payload)
+        except ValueError as exc:
+            return HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+
+        prediction, version = await self.batchers[name].submit(row)
+        return HTTPStatus.OK, {
+            "model": name, "prediction": prediction, "model_version": version
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {
+                        "error": "Request body too large"
+                    }
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = await self.dispatch(method, path, body)
+                    except Exception as exc:
+                        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                            "error": str(exc)
+                        }
+                    keep_alive = (
+                        version == "HTTP/1.1"
+                        and headers.get("connection", "").lower() != "close"
+                    )
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    "\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, window, max_rows, threads):
+    # Load (or pick up already compiled) models before accepting traffic.
+    for name in MODEL_NAMES:
+        inference.get_model(name)
+    # New registry versions are swapped in while serving.
+    registry.start_watcher()
+    server = InferenceServer(window, max_rows, threads)
+    listener = await server.start(host, port)
+    print(f"Serving on http://{host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m intellihealth.server",
+        description="Serve the IntelliHealth models over HTTP with micro-batching.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--batch-window-ms", type=float, default=2.0)
+    parser.add_argument("--batch-max-rows", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=len(MODEL_NAMES))
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                args.batch_window_ms / 1000,
+                args.batch_max_rows,
+                args.threads,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Materialized per-user health trends.
+
+The SQLite history store keeps one ``trend_agg`` row per user and
+calendar day, ISO week and month, holding the count, sum, min and max of
+stress, sleep and calories.  Each saved record upserts its three rows in
+the same transaction (O(1) per insert), so trend views never scan raw
+history:
+
+* weekly / monthly min, mean and max come straight from ``trend_agg``;
+* 7- and 30-day rolling means sum at most 30 daily rows.
+
+``rebuild`` recomputes everything from history in one streaming pass,
+for backfills or after importing data by other means.  The ``*_frame``
+functions compute the same results from a history DataFrame, for
+backends without materialized aggregates.  Records with a missing or
+non-finite metric (``schema.all_finite``) are left out.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from intellihealth.schema import all_finite
+
+PERIODS = ("day", "week", "month")
+METRICS = ("stress", "sleep", "calories")
+ROLLING_WINDOWS = (7, 30)
+
+_AGG_COLUMNS = [f"{m}_{stat}" for m in METRICS for stat in ("sum", "min", "max")]
+
+
+def period_keys(timestamp):
+    """``{"day": "2025-01-31", "week": "2025-W05", "month": "2025-01"}``."""
+    day = timestamp[:10]
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return {"day": day, "week": f"{year}-W{week:02d}", "month": day[:7]}
+
+
+# --------------------------------------------------
+# SQLITE AGGREGATES
+# --------------------------------------------------
+def ensure_schema(conn):
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS trend_agg ("
+        " username TEXT NOT NULL, period TEXT NOT NULL, key TEXT NOT NULL,"
+        " n INTEGER NOT NULL, "
+        + ", ".join(f"{c} REAL" for c in _AGG_COLUMNS)
+        + ", PRIMARY KEY (username, period, key)) WITHOUT ROWID"
+    )
+
+
+_UPSERT = (
+    "INSERT INTO trend_agg (username, period, key, n, "
+    + ", ".join(_AGG_COLUMNS)
+    + ") VALUES (?, ?, ?, 1, "
+    + ", ".join("?" for _ in _AGG_COLUMNS)
+    + ") ON CONFLICT (username, period, key) DO UPDATE SET n = n + 1, "
+    + ", ".join(
+        f"{m}_sum = {m}_sum + excluded.{m}_sum, "
+        f"{m}_min = MIN({m}_min, excluded.{m}_min), "
+        f"{m}_max = MAX({m}_max, excluded.{m}_max)"
+        for m in METRICS
+    )
+)
+
+
+def update(conn, rows):
+    """Fold history rows into ``trend_agg``; call inside the insert's transaction."""
+    params = []
+    for username, timestamp, *values in rows:
+        # Columns after the metrics (e.g. model_version) are not aggregated.
+        values = values[:len(METRICS)]
+        if not all_finite(values):
+            continue
+        stats = [float(v) for v in values for _ in range(3)]
+        for period, key in period_keys(timestamp).items():
+            params.append((username, period, key, *stats))
+    conn.executemany(_UPSERT, params)
+
+
+def rebuild(conn, batch_size=50_000):
+    """Recompute ``trend_agg`` from the history table in one pass."""
+    acc = {}
+    cursor = conn.execute(
+        "SELECT username, timestamp, stress, sleep, calories FROM history ORDER BY id"
+    )
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        for username, timestamp, *values in batch:
+            if not all_finite(values):
+                continue
+            for period, key in period_keys(timestamp).items():
+                entry = acc.get((username, period, key))
+                if entry is None:
+                    acc[(username, period, key)] = [1] + [float(v) for v in values for _ in range(3)]
+                    continue
+                entry[0] += 1
+                for i, v in enumerate(values):
+                    entry[1 + 3 * i] += v
+                    entry[2 + 3 * i] = min(entry[2 + 3 * i], v)
+                    entry[3 + 3 * i] = max(entry[3 + 3 * i], v)
+
+    with conn:
+        conn.execute("DELETE FROM trend_agg")
+        conn.executemany(
+            "INSERT INTO trend_agg VALUES (?, ?, ?, ?, "
+            + ", ".join("?" for _ in _AGG_COLUMNS)
+            + ")",
+            ((*key, *entry) for key, entry in acc.items()),
+        )
+    return len(acc)
+
+
+def _period_frame(agg):
+    """Turn sum/min/max/n columns into min/mean/max per metric."""
+    out = agg[["key", "n"]].rename(columns={"key": "period", "n": "records"})
+    for m in METRICS:
+        out[f"{m}_min"] = agg[f"{m}_min"]
+        out[f"{m}_mean"] = agg[f"{m}_sum"] / agg["n"]
+        out[f"{m}_max"] = agg[f"{m}_max"]
+    return out.reset_index(drop=True)
+
+
+def load_periods(conn, username, period):
+    agg = pd.read_sql_query(
+        "SELECT * FROM trend_agg WHERE username = ? AND period = ? ORDER BY key",
+        conn,
+        params=(username, period),
+    )
+    return _period_frame(agg)
+
+
+def rolling_means(conn, username, windows=ROLLING_WINDOWS):
+    """Mean of each metric over the last N days up to the user's latest record."""
+    last = conn.execute(
+        "SELECT MAX(key) FROM trend_agg WHERE username = ? AND period = 'day'",
+        (username,),
+    ).fetchone()[0]
+    if last is None:
+        return {}
+    result = {}
+    for days in windows:
+        cutoff = (date.fromisoformat(last) - timedelta(days=days)).isoformat()
+        row = conn.execute(
+            "SELECT SUM(n), "
+            + ", ".join(f"SUM({m}_sum)" for m in METRICS)
+            + " FROM trend_agg WHERE username = ? AND period = 'day' AND key > ?",
+            (username, cutoff),
+        ).fetchone()
+        result[days] = {m: row[1 + i] / row[0] for i, m in enumerate(METRICS)}
+    return result
+
+
+# --------------------------------------------------
+# DATAFRAME FALLBACK
+# --------------------------------------------------
+def _finite_rows(history):
+    values = history[list(METRICS)].to_numpy(dtype=float)
+    return history[np.isfinite(values).all(axis=1)]
+
+
+def periods_frame(history, period):
+    history = _finite_rows(history)
+    if history.empty:
+        return _period_frame(pd.DataFrame(columns=["key", "n", *_AGG_COLUMNS]))
+    keys = history["timestamp"].map(lambda ts: period_keys(ts)[period])
+    grouped = history.groupby(keys)
+    agg = pd.DataFrame({"n": grouped.size()})
+    for m in METRICS:
+        agg[f"{m}_sum"] = grouped[m].sum()
+        agg[f"{m}_min"] = grouped[m].min()
+        agg[f"{m}_max"] = grouped[m].max()
+    return _period_frame(agg.rename_axis("key").reset_index())
+
+
+def rolling_frame(history, windows=ROLLING_WINDOWS):
+    history = _finite_rows(history)
+    if history.empty:
+        return {}
+    days = history["timestamp"].str[:10]
+    last = date.fromisoformat(days.max())
+    result = {}
+    for n in windows:
+        recent = history[days > (last - timedelta(days=n)).isoformat()]
+        result[n] = {m: float(recent[m].mean()) for m in METRICS}
+    return result
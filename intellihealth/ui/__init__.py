@@ -0,0 +1,62 @@
+"""Streamlit pages, one module per sidebar entry.
+
+``app.py`` imports a page's module only when that page is shown, and each
+module imports only what it uses, so the heavy libraries load on demand:
+matplotlib with the Visualization Dashboard, the models (NumPy, pandas,
+joblib/scikit-learn) with the prediction pages, pandas with history and
+pyarrow with the admin Cohort Dashboard.  The login page needs none of
+them.
+
+Each module exposes ``render()``; the module itself is imported once per
+process, ``render()`` runs on every rerun.
+"""
+
+import importlib
+import os
+import threading
+
+PAGES = {
+    "Home": "home",
+    "Full Check-up": "checkup",
+    "Stress Analysis": "stress",
+    "Sleep Analysis": "sleep",
+    "Calorie Analysis": "calorie",
+    "Visualization Dashboard": "dashboard",
+    "Final Recommendations": "recommendations",
+    "My Health History": "history",
+}
+
+# Only listed for users in ``INTELLIHEALTH_ADMIN_USERS``.
+ADMIN_PAGES = {
+    "Cohort Dashboard": "cohort",
+}
+
+# Load the models in the background once someone has logged in.
+PREFETCH = os.environ.get("INTELLIHEALTH_PREFETCH", "1") != "0"
+
+_prefetch_started = False
+_prefetch_lock = threading.Lock()
+
+
+def render(page):
+    module = PAGES.get(page) or ADMIN_PAGES[page]
+    importlib.import_module(f"{__name__}.{module}").render()
+
+
+def _prefetch():
+    from intellihealth import inference, registry
+
+    inference.prefetch()
+    registry.start_watcher()
+
+
+def start_prefetch():
+    """Import the inference stack and start loading models off the main thread."""
+    global _prefetch_started
+    if not PREFETCH or _prefetch_started:
+        return
+    with _prefetch_lock:
+        if _prefetch_started:
+            return
+        threading.Thread(target=_prefetch, name="model-prefetch", daemon=True).start()
+        _prefetch_started = True
@@ -0,0 +1,47 @@
+"""Results that are unusual for this user, on the Visualization Dashboard
+and Final Recommendations pages."""
+
+import math
+
+import streamlit as st
+
+from intellihealth import baselines
+from intellihealth import history as history_store
+
+_LABELS = {"stress": "🧠 Stress", "sleep": "😴 Sleep quality", "calories": "🔥 Calories"}
+_FORMATS = {"stress": "{:.1f}", "sleep": "{:.1f}", "calories": "{:.0f} kcal"}
+
+
+def snapshot():
+    """The user's baseline as it was before this session's results were saved."""
+    if "baseline" not in st.session_state:
+        st.session_state.baseline = history_store.load_baseline(st.session_state.username)
+    return st.session_state.baseline
+
+
+def render(stress, sleep, calories):
+    state = snapshot()
+    values = (stress, sleep, calories)
+    if state is None or state["n"] < baselines.MIN_RECORDS:
+        saved = 0 if state is None else state["n"]
+        st.caption(
+            f"Personal baselines start after {baselines.MIN_RECORDS} saved check-ups "
+            f"({saved} so far)."
+        )
+        return
+
+    flags = baselines.unusual(state, values)
+    for metric, value in zip(baselines.METRICS, values):
+        if metric not in flags:
+            continue
+        fmt = _FORMATS[metric]
+        mean, var, _ = state[metric]
+        direction = "higher" if flags[metric] > 0 else "lower"
+        st.info(
+            f"{_LABELS[metric]} is {direction} than usual for you: {fmt.format(value)} "
+            f"(your usual: {fmt.format(mean)} ± {fmt.format(math.sqrt(var))})."
+        )
+    if not flags:
+        st.caption(
+            f"All results are within your usual range (from {state['n']} saved check-ups)."
+        )
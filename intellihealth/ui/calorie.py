@@ -0,0 +1,111 @@
+"""Calorie Analysis page."""
+
+import streamlit as st
+
+from intellihealth.ui import explain, whatif
+from intellihealth.ui.models import predict
+
+
+def render():
+    st.header("🔥 Calorie Prediction")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        steps = st.number_input("Steps", 0, 30000, key="steps")
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 30,000 steps")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        distance = st.number_input("Distance (km)", 0.0, 30.0, key="distance")
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 30 km")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        light = st.number_input("Light Activity Minutes", 0, 500, key="light")
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 500 mins")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        moderate = st.number_input("Moderate Activity Minutes", 0, 300, key="moderate")
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 300 mins")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        vigorous = st.number_input("Vigorous Activity Minutes", 0, 180, key="vigorous")
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 180 mins")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        sedentary = st.number_input("Sedentary Minutes", 0, 1440, key="sedentary")
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 1,440 mins")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        bpm = st.number_input("Average BPM", 40.0, 150.0, key="bpm")
+    with col2:
+        st.markdown("**Allowed Range:** 40 – 150 bpm")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        nremhr = st.number_input("NREM Heart Rate (bpm)", 40.0, 120.0, key="nremhr")
+    with col2:
+        st.markdown("**Allowed Range:** 40 – 120 bpm")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        rmssd = st.number_input("RMSSD (HRV)", 10.0, 150.0, key="rmssd")
+    with col2:
+        st.markdown("**Allowed Range:** 10 – 150 ms")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        sleep_duration = st.number_input(
+            "Sleep Duration (hours)", 0.0, 12.0, key="sleep_duration"
+        )
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 12 hours")
+
+    if st.button("Predict Calories"):
+        row = [
+            steps,
+            distance,
+            light,
+            moderate,
+            vigorous,
+            sedentary,
+            bpm,
+            nremhr,
+            rmssd,
+            sleep_duration
+        ]
+        st.session_state.calories = predict("calorie", row)
+        st.metric(
+            "Predicted Calories",
+            f"{int(st.session_state.calories)} kcal/day"
+        )
+
+        # ---------------- Attributions ----------------
+        explain.render("calorie", row)
+
+    # ---------------- What if ----------------
+    whatif.render(
+        "calorie",
+        {
+            "steps": steps,
+            "distance": distance,
+            "light": light,
+            "moderate": moderate,
+            "vigorous": vigorous,
+            "sedentary": sedentary,
+            "bpm": bpm,
+            "nremhr": nremhr,
+            "rmssd": rmssd,
+            "sleep_duration": sleep_duration
+        }
+    )
@@ -0,0 +1,60 @@
+"""Full Check-up: all three models from one form."""
+
+import streamlit as st
+
+from intellihealth import inference
+from intellihealth.schema import INPUT_LABELS, INPUT_RANGES, checkup_inputs, model_rows
+from intellihealth.ui.models import load_artifacts
+
+
+def render():
+    st.header("🩺 Full Check-up")
+    st.markdown(
+        "Enter each value once to get your stress, sleep and calorie results together."
+    )
+
+    with st.form("checkup"):
+        values = {}
+        cols = st.columns(3)
+        for i, key in enumerate(checkup_inputs()):
+            lo, hi, _ = INPUT_RANGES[key]
+            with cols[i % 3]:
+                if key in ("deep", "rem"):
+                    values[key] = st.slider(INPUT_LABELS[key], lo, hi, key=key)
+                else:
+                    values[key] = st.number_input(INPUT_LABELS[key], lo, hi, key=key)
+        submitted = st.form_submit_button("Run Full Check-up")
+
+    if submitted:
+        for name in ("stress", "sleep", "calorie"):
+            load_artifacts(name)
+        versions = st.session_state.setdefault("model_versions", {})
+        results = inference.predict_all(model_rows(values), versions)
+        st.session_state.stress = results["stress"]
+        st.session_state.sleep = results["sleep"]
+        st.session_state.calories = results["calorie"]
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Stress Index", f"{st.session_state.stress:.2f}")
+            if st.session_state.stress > 70:
+                st.error("Stress Level: High")
+            elif st.session_state.stress > 50:
+                st.warning("Stress Level: Moderate")
+            else:
+                st.success("Stress Level: Low")
+        with col2:
+            st.metric("Sleep Quality Index", f"{st.session_state.sleep:.2f}")
+            if st.session_state.sleep > 65:
+                st.success("Sleep Quality: Good")
+            elif st.session_state.sleep > 45:
+                st.warning("Sleep Quality: Average")
+            else:
+                st.error("Sleep Quality: Poor")
+        with col3:
+            st.metric(
+                "Predicted Calories",
+                f"{int(st.session_state.calories)} kcal/day"
+            )
+
+        st.info("👉 Open Final Recommendations to see your advice and save the results.")
@@ -0,0 +1,96 @@
+"""Cohort Dashboard (admin): population-wide stress, sleep and calories."""
+
+import threading
+import time
+
+import streamlit as st
+
+from intellihealth import analytics
+
+# Seconds between syncs of the analytics store, shared by every session.
+SYNC_INTERVAL = 60
+
+_sync_lock = threading.Lock()
+_last_sync = None
+
+
+def _sync(force=False):
+    """Run ``analytics.sync()`` unless it ran less than ``SYNC_INTERVAL``
+    seconds ago; sessions arriving meanwhile wait for it and then skip."""
+    global _last_sync
+    with _sync_lock:
+        now = time.monotonic()
+        if not force and _last_sync is not None and now - _last_sync < SYNC_INTERVAL:
+            return
+        analytics.sync()
+        _last_sync = now
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _cohort(start, end, version):
+    return analytics.cohort_summary(start, end)
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _monthly(start, end, version):
+    return analytics.monthly_means(start, end)
+
+
+def _distribution_chart(values, label):
+    import pandas as pd
+
+    bins, counts = analytics.distribution(values)
+    st.bar_chart(
+        pd.DataFrame({label: [f"{b}-{b + 5}" for b in bins], "users": counts}),
+        x=label,
+        y="users"
+    )
+
+
+def render():
+    st.header("👥 Cohort Dashboard")
+
+    force = st.button("🔄 Sync now")
+    try:
+        with st.spinner("Syncing analytics store..."):
+            _sync(force)
+    except ImportError as exc:
+        st.error(str(exc))
+        return
+
+    if st.button("🗜️ Compact store"):
+        with st.spinner("Compacting..."):
+            st.caption(f"Merged {analytics.compact()} files.")
+
+    available = analytics.months()
+    if not available:
+        st.info("No health records found yet.")
+        return
+
+    start, end = st.select_slider(
+        "Months",
+        options=available,
+        value=(available[0], available[-1])
+    )
+    # Cached per store version, so reruns only re-query after new rows sync.
+    version = analytics.version()
+    summary, per_user = _cohort(start, end, version)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Users", f"{summary['users']:,}")
+    col2.metric("Records", f"{summary['records']:,}")
+    col3.metric(f"Stress > {analytics.STRESS_HIGH}", f"{summary['share_stress_high']:.1%}")
+    col4.metric(f"Sleep < {analytics.SLEEP_POOR}", f"{summary['share_sleep_poor']:.1%}")
+    st.caption("Shares of users, by each user's mean over the selected months.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Mean stress per user")
+        _distribution_chart(per_user["stress"], "stress")
+    with col2:
+        st.subheader("Mean sleep per user")
+        _distribution_chart(per_user["sleep"], "sleep")
+
+    st.subheader("📈 Monthly cohort means")
+    monthly = _monthly(start, end, version)
+    st.line_chart(monthly.set_index("month")[analytics.METRIC_COLUMNS])
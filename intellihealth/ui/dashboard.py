@@ -0,0 +1,72 @@
+"""Visualization Dashboard; the only page that needs matplotlib."""
+
+import streamlit as st
+
+from intellihealth import charts, metrics
+from intellihealth.ui import baseline
+
+
+def render():
+    st.header("📊 Health Overview Dashboard")
+
+    if None in (
+        st.session_state.get("stress"),
+        st.session_state.get("sleep"),
+        st.session_state.get("calories")
+    ):
+        st.warning("Please run Stress, Sleep, and Calorie predictions first.")
+    else:
+        with metrics.span("dashboard_render"):
+            st.image(
+                charts.indicators_png(
+                    st.session_state.stress,
+                    st.session_state.sleep,
+                    st.session_state.calories
+                ),
+                width="stretch"
+            )
+
+        # ----------------------------
+        # HEALTH INTERPRETATION
+        # ----------------------------
+        st.subheader("🧾 Health Interpretation")
+
+        # Stress interpretation
+        if st.session_state.stress > 70:
+            st.error(f"🧠 Stress Level: High ({st.session_state.stress:.1f})")
+        elif st.session_state.stress > 50:
+            st.warning(f"🧠 Stress Level: Moderate ({st.session_state.stress:.1f})")
+        else:
+            st.success(f"🧠 Stress Level: Low ({st.session_state.stress:.1f})")
+
+        # Sleep interpretation
+        if st.session_state.sleep > 65:
+            st.success(f"😴 Sleep Quality: Good ({st.session_state.sleep:.1f})")
+        elif st.session_state.sleep > 45:
+            st.warning(f"😴 Sleep Quality: Average ({st.session_state.sleep:.1f})")
+        else:
+            st.error(f"😴 Sleep Quality: Poor ({st.session_state.sleep:.1f})")
+
+        # Calorie interpretation
+        if st.session_state.calories > 2800:
+            st.warning(
+                f"🔥 Calorie Expenditure: High ({int(st.session_state.calories)} kcal)"
+            )
+        elif st.session_state.calories > 2000:
+            st.success(
+                f"🔥 Calorie Expenditure: Average ({int(st.session_state.calories)} kcal)"
+            )
+        else:
+            st.info(
+                f"🔥 Calorie Expenditure: Low ({int(st.session_state.calories)} kcal)"
+            )
+
+        # ----------------------------
+        # PERSONAL BASELINE
+        # ----------------------------
+        st.subheader("📌 Compared with Your Usual")
+        baseline.render(
+            st.session_state.stress,
+            st.session_state.sleep,
+            st.session_state.calories
+        )
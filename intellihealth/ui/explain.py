@@ -0,0 +1,32 @@
+"""Which inputs drove a prediction, shown under the result on the
+Stress, Sleep and Calorie pages."""
+
+import streamlit as st
+
+from intellihealth.schema import INPUT_LABELS, MODEL_INPUTS
+from intellihealth.ui.models import explain
+
+# Derived inputs have no widget of their own.
+_LABELS = {
+    **INPUT_LABELS,
+    "minutes_asleep": "Minutes Asleep (from duration)",
+    "sleep_light_ratio": "Light Sleep Ratio (from deep/REM)",
+}
+
+
+def render(name, row):
+    import pandas as pd
+
+    bias, contributions = explain(name, row)
+    ranked = pd.DataFrame({
+        "input": [_LABELS[key] for key in MODEL_INPUTS[name]],
+        "contribution": contributions,
+    })
+    ranked = ranked.reindex(ranked["contribution"].abs().sort_values(ascending=False).index)
+
+    st.subheader("What drove this result")
+    st.bar_chart(ranked, x="input", y="contribution", horizontal=True, sort=False)
+    st.caption(
+        f"Starting from the model's average of {bias:.1f}, each bar shows how "
+        "much that input pushed this prediction up or down."
+    )
@@ -0,0 +1,130 @@
+"""My Health History: paged records and trends."""
+
+import math
+from datetime import date, timedelta
+
+import streamlit as st
+
+from intellihealth import history as history_store
+from intellihealth.downsample import downsample_frame
+
+HISTORY_PAGE_SIZE = 50
+
+
+def render():
+    st.header("📊 My Health History")
+
+    username = st.session_state.username
+
+    # ---------------- Bulk import ----------------
+    with st.expander("📥 Import wearable export"):
+        st.caption(
+            "Daily CSV, JSON or JSON Lines export (e.g. from Fitbit). "
+            "Each day is scored and added to your history."
+        )
+        upload = st.file_uploader("Export file", type=["csv", "json", "jsonl", "ndjson"])
+        if upload is not None and st.button("Import"):
+            # Pulls in the models; only loaded when an import actually runs.
+            from intellihealth import importer
+
+            progress = st.empty()
+            try:
+                stats = importer.import_export(
+                    upload,
+                    username,
+                    on_chunk=lambda s: progress.caption(f"{s['read']} rows read...")
+                )
+            except ValueError as exc:
+                st.error(f"Could not import {upload.name}: {exc}")
+            else:
+                st.success(
+                    f"Imported {stats['imported']} days "
+                    f"({stats['skipped_invalid']} incomplete, "
+                    f"{stats['skipped_duplicate']} repeated days, "
+                    f"{stats['skipped_existing']} already saved)."
+                )
+
+    first, last = history_store.history_bounds(username)
+
+    if first is None:
+        st.info("No health records found yet.")
+    else:
+        first_day = date.fromisoformat(first[:10])
+        last_day = date.fromisoformat(last[:10])
+        selected = st.date_input(
+            "Date range",
+            value=(first_day, last_day),
+            min_value=first_day,
+            max_value=last_day
+        )
+        # The range is filtered in the history store, not in pandas.
+        start = selected[0].isoformat()
+        end = (selected[-1] + timedelta(days=1)).isoformat()
+        total = history_store.count_history(username, start, end)
+
+        if total == 0:
+            st.info("No health records in this date range.")
+        else:
+            pages = math.ceil(total / HISTORY_PAGE_SIZE)
+            page_number = st.number_input("Page", 1, pages, 1)
+            st.caption(f"{total} records · page {page_number} of {pages}")
+            st.dataframe(
+                history_store.load_history(
+                    username,
+                    start,
+                    end,
+                    limit=HISTORY_PAGE_SIZE,
+                    offset=(page_number - 1) * HISTORY_PAGE_SIZE
+                ),
+                width="stretch"
+            )
+
+            series = history_store.load_history(
+                username,
+                start,
+                end,
+                columns=["timestamp", "stress", "sleep", "calories"]
+            )
+            series = downsample_frame(series, ["stress", "sleep", "calories"])
+            st.line_chart(
+                series.set_index("timestamp")[["stress", "sleep", "calories"]]
+            )
+
+        # ---------------- Trends (pre-aggregated, no raw rows) ----------------
+        st.subheader("📈 Trends")
+        rolling = history_store.rolling_means(username)
+        # Empty when no saved record has all three results.
+        if not rolling:
+            st.caption("No complete records to average yet.")
+        else:
+            week, month = rolling[7], rolling[30]
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(
+                    "Stress (7-day avg)",
+                    f"{week['stress']:.1f}",
+                    f"{week['stress'] - month['stress']:+.1f} vs 30-day",
+                    delta_color="inverse"
+                )
+            with col2:
+                st.metric(
+                    "Sleep (7-day avg)",
+                    f"{week['sleep']:.1f}",
+                    f"{week['sleep'] - month['sleep']:+.1f} vs 30-day"
+                )
+            with col3:
+                st.metric(
+                    "Calories (7-day avg)",
+                    f"{int(week['calories'])} kcal",
+                    f"{week['calories'] - month['calories']:+.0f} vs 30-day",
+                    delta_color="off"
+                )
+
+        period = st.radio("Summarize by", ["Week", "Month"], horizontal=True)
+        summary = history_store.load_trends(username, period.lower())
+        st.dataframe(summary, width="stretch", hide_index=True)
+        if not summary.empty:
+            st.line_chart(
+                summary.set_index("period")[["stress_mean", "sleep_mean", "calories_mean"]]
+            )
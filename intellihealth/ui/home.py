@@ -0,0 +1,67 @@
+"""Home page."""
+
+import streamlit as st
+
+
+def render():
+    st.markdown(
+        "<h1 style='text-align:center; color:#1F618D;'>"
+        "🩺 Intelligent Health Monitoring System</h1>",
+        unsafe_allow_html=True
+    )
+
+    st.markdown(
+        "<h4 style='text-align:center;'>"
+        "Predict • Monitor • Improve Your Health</h4>",
+        unsafe_allow_html=True
+    )
+
+    st.markdown("---")
+
+    st.subheader("👋 Welcome!")
+
+    st.markdown("""
+    This application helps you **monitor your daily health status**
+    by analyzing **stress levels**, **sleep quality**, and **calorie expenditure**.
+
+    Simply enter your daily activity and sleep details to receive
+    **personalized health insights**.
+    """)
+
+    st.markdown("---")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.markdown("### 🧠 Stress Monitoring")
+        st.markdown("""
+        - Analyze physiological signals  
+        - Detect stress levels  
+        - Support mental well-being  
+        """)
+
+    with col2:
+        st.markdown("### 😴 Sleep Analysis")
+        st.markdown("""
+        - Evaluate sleep quality  
+        - Identify poor sleep patterns  
+        - Improve recovery and rest  
+        """)
+
+    with col3:
+        st.markdown("### 🔥 Calorie Tracking")
+        st.markdown("""
+        - Estimate daily calorie burn  
+        - Based on activity & movement  
+        - Encourage healthy lifestyle  
+        """)
+
+    st.markdown("---")
+
+    st.info(
+        "👉 Use the menu on the left to analyze your Stress, Sleep, or Calories."
+    )
+
+    st.caption(
+        "This system uses machine learning to provide decision support for personal health monitoring."
+    )
@@ -0,0 +1,45 @@
+"""Login and sign-up tabs."""
+
+import streamlit as st
+
+from intellihealth import users as user_store
+
+
+def render():
+    st.markdown(
+        "<h1 style='text-align:center; color:#1F618D;'>🩺 IntelliHealth</h1>",
+        unsafe_allow_html=True
+    )
+    st.markdown(
+        "<h5 style='text-align:center;'>Intelligent Health Monitoring System</h5>",
+        unsafe_allow_html=True
+    )
+    st.markdown("---")
+
+    tab1, tab2 = st.tabs(["🔐 Login", "📝 Sign Up"])
+
+    with tab1:
+        username = st.text_input("Username")
+        password = st.text_input("Password", type="password")
+
+        if st.button("Login"):
+            if user_store.verify_user(username, password):
+                st.session_state.logged_in = True
+                st.session_state.username = username
+                st.session_state.history_saved = False
+                st.success("Login successful!")
+                st.rerun()
+            else:
+                st.error("Invalid username or password")
+
+    with tab2:
+        new_username = st.text_input("Create Username")
+        new_password = st.text_input("Create Password", type="password")
+
+        if st.button("Create Account"):
+            if new_username == "" or new_password == "":
+                st.warning("Please fill all fields")
+            elif not user_store.save_user(new_username, new_password):
+                st.error("Username already exists")
+            else:
+                st.success("Account created successfully! Please login.")
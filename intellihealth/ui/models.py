@@ -0,0 +1,40 @@
+"""Model access for the prediction pages.
+
+Importing this module pulls in ``intellihealth.inference`` (NumPy, pandas,
+joblib), so only pages that predict import it.
+"""
+
+import streamlit as st
+
+from intellihealth import inference
+
+
+def load_artifacts(name):
+    # Models load lazily on first use (or in the background after login),
+    # so the login page never waits on them.
+    handle = inference.model_handle(name)
+    if not handle.loaded:
+        with st.spinner(f"Loading {name} model..."):
+            handle.get()
+    return handle
+
+
+def predict(name, row, record=True):
+    """``record=False`` for predictions that are not stored as the page's
+    result (e.g. what-if), so the saved version keeps matching the score."""
+    # Repeated inputs are answered from a process-wide LRU cache.
+    prediction, version = load_artifacts(name).predict_row_versioned(row)
+    if record:
+        # Saved with the results on the Final Recommendations page.
+        st.session_state.setdefault("model_versions", {})[name] = version
+    return prediction
+
+
+def sweep(name, row, key):
+    # One batched predict for the whole grid; not cached.
+    load_artifacts(name)
+    return inference.sweep(name, row, key)
+
+
+def explain(name, row):
+    return load_artifacts(name).explain_row(row)
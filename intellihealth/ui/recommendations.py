@@ -0,0 +1,101 @@
+"""Final Recommendations; saves the session's results to history."""
+
+import streamlit as st
+
+from intellihealth import history as history_store
+from intellihealth.registry import version_label
+from intellihealth.ui import baseline
+
+# Seconds to wait for the save to commit; if it takes longer, the next
+# rerun checks again.
+SAVE_WAIT = 2.0
+
+
+def _save_status():
+    """Report the pending save once it has committed or failed."""
+    future = st.session_state.get("history_future")
+    if future is None:
+        return
+    try:
+        future.result(timeout=SAVE_WAIT)
+    except TimeoutError:
+        st.info("⏳ Saving your health data...")
+        return
+    except Exception as exc:
+        # Cleared so that opening this page again retries the save.
+        st.session_state.history_saved = False
+        st.error(f"Could not save your health data: {exc}")
+    else:
+        st.success("📁 Health data saved to your history!")
+    st.session_state.history_future = None
+
+
+def render():
+    st.header("✅ Personalized Health Recommendations")
+
+    if None in (
+        st.session_state.get("stress"),
+        st.session_state.get("sleep"),
+        st.session_state.get("calories")
+    ):
+        st.warning("Please complete all analyses first.")
+    else:
+        stress = st.session_state.stress
+        sleep = st.session_state.sleep
+        calories = st.session_state.calories
+
+        # Compare against the baseline from before this save.
+        baseline.snapshot()
+
+        # ✅ Save history ONLY ONCE per session
+        if not st.session_state.history_saved:
+            try:
+                st.session_state.history_future = history_store.save_history(
+                    st.session_state.username,
+                    stress,
+                    sleep,
+                    calories,
+                    version_label(st.session_state.get("model_versions", {}))
+                )
+                st.session_state.history_saved = True
+            except TimeoutError as exc:
+                st.error(f"Could not save your health data: {exc}")
+        _save_status()
+
+        # ---------------- Compared with your usual ----------------
+        st.subheader("📌 Compared with Your Usual")
+        baseline.render(stress, sleep, calories)
+
+        # ---------------- Stress ----------------
+        st.subheader("🧠 Stress Recommendation")
+        if stress > 70:
+            st.error("High stress detected. Practice relaxation techniques and reduce workload.")
+        elif stress > 50:
+            st.warning("Moderate stress detected. Monitor stress and maintain balance.")
+        else:
+            st.success("Low stress detected. Maintain your current stress-management habits.")
+
+        # ---------------- Sleep ----------------
+        st.subheader("😴 Sleep Recommendation")
+        if sleep > 65:
+            st.success("Good sleep quality. Maintain consistent sleep routines.")
+        elif sleep > 45:
+            st.warning("Average sleep quality. Improve sleep hygiene and consistency.")
+        else:
+            st.error("Poor sleep quality. Prioritize adequate sleep and reduce disruptions.")
+
+        # ---------------- Calories ----------------
+        st.subheader("🔥 Calorie Recommendation")
+        if calories > 2800:
+            st.warning("High calorie expenditure. Ensure sufficient nutrition and hydration.")
+        elif calories > 2000:
+            st.success("Balanced calorie expenditure. Maintain your activity levels.")
+        else:
+            st.info("Low calorie expenditure. Consider increasing physical activity.")
+
+        st.markdown("""
+        **Overall Advice:**
+        - Maintain a consistent daily routine  
+        - Balance activity, recovery, and nutrition  
+        - Monitor stress and sleep regularly  
+        """)
@@ -0,0 +1,113 @@
+"""Sleep Analysis page."""
+
+import streamlit as st
+
+from intellihealth.ui import explain, whatif
+from intellihealth.ui.models import predict
+
+
+def render():
+    st.header("😴 Sleep Quality Analysis")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        sleep_duration = st.number_input(
+            "Sleep Duration (hours)", 0.0, 12.0, key="sleep_duration"
+        )
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 12 hours")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        efficiency = st.number_input(
+            "Sleep Efficiency (%)", 0.0, 100.0, key="efficiency"
+        )
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 100 %")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        deep = st.slider(
+            "Deep Sleep Ratio", 0.0, 1.0, key="deep"
+        )
+    with col2:
+        st.markdown("**Allowed Range:** 0.0 – 1.0")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        rem = st.slider(
+            "REM Sleep Ratio", 0.0, 1.0, key="rem"
+        )
+    with col2:
+        st.markdown("**Allowed Range:** 0.0 – 1.0")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        awake = st.number_input(
+            "Minutes Awake", 0, 300, key="awake"
+        )
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 300 mins")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        breathing = st.number_input(
+            "Breathing Rate (breaths/min)", 10.0, 25.0, key="breathing"
+        )
+    with col2:
+        st.markdown("**Allowed Range:** 10 – 25 breaths/min")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        nremhr = st.number_input(
+            "NREM Heart Rate (bpm)", 40.0, 120.0, key="nremhr"
+        )
+    with col2:
+        st.markdown("**Allowed Range:** 40 – 120 bpm")
+
+    if st.button("Predict Sleep Quality"):
+        minutes_asleep = sleep_duration * 60
+        sleep_light_ratio = max(0.0, 1.0 - (deep + rem))
+
+        row = [
+            sleep_duration,
+            efficiency,
+            minutes_asleep,
+            awake,
+            deep,
+            sleep_light_ratio,
+            rem,
+            breathing,
+            nremhr
+        ]
+        st.session_state.sleep = predict("sleep", row)
+
+        st.metric(
+            "Sleep Quality Index",
+            f"{st.session_state.sleep:.2f}"
+        )
+
+        # ---------------- Interpretation ----------------
+        if st.session_state.sleep > 65:
+            st.success("Sleep Quality: Good")
+        elif st.session_state.sleep > 45:
+            st.warning("Sleep Quality: Average")
+        else:
+            st.error("Sleep Quality: Poor")
+
+        # ---------------- Attributions ----------------
+        explain.render("sleep", row)
+
+    # ---------------- What if ----------------
+    whatif.render(
+        "sleep",
+        {
+            "sleep_duration": sleep_duration,
+            "efficiency": efficiency,
+            "deep": deep,
+            "rem": rem,
+            "awake": awake,
+            "breathing": breathing,
+            "nremhr": nremhr
+        }
+    )
@@ -0,0 +1,91 @@
+"""Stress Analysis page."""
+
+import streamlit as st
+
+from intellihealth.ui import explain, whatif
+from intellihealth.ui.models import predict
+
+
+def render():
+    st.header("🧠 Stress Analysis")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        rmssd = st.number_input("RMSSD (HRV)", 10.0, 150.0, key="rmssd")
+    with col2:
+        st.markdown("**Allowed Range:** 10 – 150 ms")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        nremhr = st.number_input("NREM Heart Rate (bpm)", 40.0, 120.0, key="nremhr")
+    with col2:
+        st.markdown("**Allowed Range:** 40 – 120 bpm")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        resting_hr = st.number_input("Resting Heart Rate (bpm)", 40.0, 120.0, key="resting_hr")
+    with col2:
+        st.markdown("**Allowed Range:** 40 – 120 bpm")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        nightly_temp = st.number_input("Nightly Temperature (°C)", 30.0, 38.0, key="nightly_temp")
+    with col2:
+        st.markdown("**Allowed Range:** 30 – 38 °C")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        steps = st.number_input("Steps", 0, 30000, key="steps")
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 30,000 steps")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        sedentary = st.number_input("Sedentary Minutes", 0, 1440, key="sedentary")
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 1,440 mins")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        sleep_duration = st.number_input("Sleep Duration (hours)", 0.0, 12.0, key="sleep_duration")
+    with col2:
+        st.markdown("**Allowed Range:** 0 – 12 hours")
+
+    if st.button("Predict Stress"):
+        row = [
+            rmssd,
+            nremhr,
+            resting_hr,
+            nightly_temp,
+            steps,
+            sedentary,
+            sleep_duration
+        ]
+        st.session_state.stress = predict("stress", row)
+
+        st.metric("Stress Index", f"{st.session_state.stress:.2f}")
+
+        # ---------------- Interpretation ----------------
+        if st.session_state.stress > 70:
+            st.error("Stress Level: High")
+        elif st.session_state.stress > 50:
+            st.warning("Stress Level: Moderate")
+        else:
+            st.success("Stress Level: Low")
+
+        # ---------------- Attributions ----------------
+        explain.render("stress", row)
+
+    # ---------------- What if ----------------
+    whatif.render(
+        "stress",
+        {
+            "rmssd": rmssd,
+            "nremhr": nremhr,
+            "resting_hr": resting_hr,
+            "nightly_temp": nightly_temp,
+            "steps": steps,
+            "sedentary": sedentary,
+            "sleep_duration": sleep_duration
+        }
+    )
@@ -0,0 +1,74 @@
+"""What-if panel for the Stress, Sleep and Calorie pages.
+
+Holds every input at its current value, sweeps one chosen input across its
+allowed range and plots the predicted score, with the page's thresholds.
+"""
+
+import numpy as np
+import streamlit as st
+
+from intellihealth.schema import INPUT_LABELS, OUTPUT_COLUMNS, build_row, raw_inputs
+from intellihealth.ui.models import predict, sweep
+
+# (label, threshold, +1 if higher scores are better else -1), as on the pages.
+THRESHOLDS = {
+    "stress": [("High stress", 70, -1)],
+    "sleep": [("Good sleep", 65, 1), ("Poor sleep", 45, 1)],
+    "calorie": [],
+}
+
+
+def _nearest_better(values, predictions, current_value, threshold, direction):
+    """Input value closest to the current one whose prediction is on the
+    good side of ``threshold``, or ``None``."""
+    better = direction * (predictions - threshold) > 0
+    if not better.any():
+        return None
+    candidates = values[better]
+    return candidates[np.argmin(np.abs(candidates - current_value))]
+
+
+def render(name, inputs):
+    """``inputs`` maps each of the page's inputs to its current value."""
+    if not st.toggle("🔀 What if...?", key=f"whatif_{name}"):
+        return
+    import pandas as pd
+
+    keys = raw_inputs(name)
+    key = st.selectbox(
+        "Change one input",
+        keys,
+        index=keys.index("sleep_duration") if "sleep_duration" in keys else 0,
+        format_func=INPUT_LABELS.get,
+        key=f"whatif_input_{name}"
+    )
+    row = build_row(name, inputs)
+    values, predictions = sweep(name, row, key)
+    output = OUTPUT_COLUMNS[name].capitalize()
+
+    curve = pd.DataFrame({f"Predicted {output.lower()}": predictions}, index=values)
+    for label, threshold, _ in THRESHOLDS[name]:
+        curve[f"{label} ({threshold})"] = threshold
+    curve.index.name = INPUT_LABELS[key]
+    st.line_chart(curve)
+
+    current = predict(name, row, record=False)
+    st.caption(
+        f"Currently {INPUT_LABELS[key]} = {inputs[key]:g}, "
+        f"predicted {output.lower()} {current:.1f}."
+    )
+    for label, threshold, direction in THRESHOLDS[name]:
+        if direction * (current - threshold) > 0:
+            continue
+        target = _nearest_better(values, predictions, inputs[key], threshold, direction)
+        side = "below" if direction < 0 else "above"
+        if target is None:
+            st.caption(
+                f"No {INPUT_LABELS[key]} in range brings {output.lower()} {side} "
+                f"{threshold} on its own."
+            )
+        else:
+            st.caption(
+                f"Nearest {INPUT_LABELS[key]} with {output.lower()} {side} "
+                f"{threshold}: {target:g}."
+            )
@@ -0,0 +1,280 @@
+"""User accounts backed by an append-only ``users.csv``.
+
+The file keeps its ``username,password`` header, but the password column
+now holds a salted PBKDF2 hash.  Rows are only ever appended; when a
+username appears more than once the last row wins.  A file from before
+hashing is rewritten once, when the store is first opened, with every
+plain-text password hashed (``migrate_plaintext``).
+
+Lookups go through an in-memory ``{username: password}`` index that is
+shared by every Streamlit session in the process.  It is refreshed from
+the file's ``(inode, size, mtime)`` signature: pure appends are read
+incrementally from the last known offset, anything else triggers a full
+reload.
+
+Signups are committed by the shared write-behind writer, so concurrent
+sessions never race on the existence check or interleave rows; each
+batch is one append and one fsync.
+"""
+
+import argparse
+import base64
+import csv
+import getpass
+import hashlib
+import hmac
+import io
+import os
+import secrets
+import threading
+
+from intellihealth import metrics, writer
+
+USERS_CSV = "users.csv"
+USER_COLUMNS = ["username", "password"]
+
+HASH_ALGORITHM = "pbkdf2_sha256"
+HASH_ITERATIONS = 200_000
+
+# Comma-separated usernames that also see the admin pages.  Sign-up refuses
+# these names; their accounts are created with ``create-admin`` (see main).
+ADMIN_USERS = {
+    u.strip() for u in os.environ.get("INTELLIHEALTH_ADMIN_USERS", "").split(",") if u.strip()
+}
+
+
+# --------------------------------------------------
+# PASSWORD HASHING
+# --------------------------------------------------
+def _pbkdf2(password, salt, iterations):
+    digest = hashlib.pbkdf2_hmac(
+        "sha256", password.encode("utf-8"), salt.encode("ascii"), iterations
+    )
+    return base64.b64encode(digest).decode("ascii")
+
+
+def hash_password(password, salt=None, iterations=HASH_ITERATIONS):
+    if salt is None:
+        salt = secrets.token_hex(16)
+    return f"{HASH_ALGORITHM}${iterations}${salt}${_pbkdf2(password, salt, iterations)}"
+
+
+def is_hashed(stored):
+    return stored.startswith(HASH_ALGORITHM + "$")
+
+
+def check_password(password, stored):
+    if not is_hashed(stored):
+        # Legacy plain-text row in a file not yet migrated (see migrate_plaintext).
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    _, iterations, salt, expected = stored.split("$", 3)
+    actual = _pbkdf2(password, salt, int(iterations))
+    return hmac.compare_digest(actual.encode("ascii"), expected.encode("ascii"))
+
+
+# Used when the username does not exist so that a failed lookup costs the
+# same as a wrong password.
+_DUMMY_HASH = hash_password(secrets.token_hex(8))
+
+
+# --------------------------------------------------
+# INDEXED USER STORE
+# --------------------------------------------------
+class UserStore:
+    def __init__(self, path=USERS_CSV):
+        self.path = path
+        self._lock = threading.RLock()
+        self._index = {}
+        self._signature = None
+        self._offset = 0
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _read_from(self, offset):
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        # Only consume complete lines; a concurrent writer may be mid-row.
+        end = data.rfind(b"\n") + 1
+        text = data[:end].decode("utf-8")
+        reader = csv.reader(io.StringIO(text))
+        if offset == 0:
+            next(reader, None)
+        for row in reader:
+            if len(row) >= 2:
+                self._index[row[0]] = row[1]
+        return offset + end
+
+    def refresh(self):
+        with self._lock, metrics.span("load_users"):
+            signature = self._stat()
+            if signature == self._signature:
+                return self._index
+            if signature is None:
+                self._index = {}
+                self._offset = 0
+            elif (
+                self._signature is not None
+                and signature[0] == self._signature[0]
+                and signature[1] >= self._offset
+            ):
+                self._offset = self._read_from(self._offset)
+            else:
+                self._index = {}
+                self._offset = self._read_from(0)
+            self._signature = signature
+            return self._index
+
+    def exists(self, username):
+        return username in self.refresh()
+
+    def count(self):
+        return len(self.refresh())
+
+    def append_many(self, entries):
+        """Append ``(username, stored, replace)`` rows with one write and fsync.
+
+        Returns one bool per entry; a new user (``replace`` false) whose name
+        is already taken, on disk or earlier in the batch, is skipped.
+        """
+        with self._lock:
+            index = self.refresh()
+            taken = set()
+            results = []
+            buf = io.StringIO()
+            out = csv.writer(buf, lineterminator="\n")
+            if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+                out.writerow(USER_COLUMNS)
+            for username, stored, replace in entries:
+                if not replace and (username in index or username in taken):
+                    results.append(False)
+                    continue
+                taken.add(username)
+                out.writerow([username, stored])
+                results.append(True)
+            if any(results):
+                with open(self.path, "a", encoding="utf-8", newline="") as f:
+                    f.write(buf.getvalue())
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.refresh()
+            return results
+
+    def migrate_plaintext(self):
+        """Hash every legacy plain-text password and atomically rewrite the
+        file (one row per user); returns the number of passwords hashed."""
+        with self._lock:
+            index = self.refresh()
+            legacy = sum(not is_hashed(stored) for stored in index.values())
+            if not legacy:
+                return 0
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8", newline="") as f:
+                out = csv.writer(f, lineterminator="\n")
+                out.writerow(USER_COLUMNS)
+                for username, stored in index.items():
+                    out.writerow([username, stored if is_hashed(stored) else hash_password(stored)])
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._signature = None
+            self.refresh()
+            return legacy
+
+    def add_user(self, username, password):
+        if is_admin(username) or self.exists(username):
+            return False
+        return self.append_many([(username, hash_password(password), False)])[0]
+
+    def verify(self, username, password):
+        stored = self.refresh().get(username)
+        if stored is None:
+            check_password(password, _DUMMY_HASH)
+            return False
+        return check_password(password, stored)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                store = UserStore()
+                store.migrate_plaintext()
+                _store = store
+    return _store
+
+
+def user_exists(username):
+    return get_user_store().exists(username)
+
+
+def _write_users(entries):
+    return get_user_store().append_many(entries)
+
+
+writer.register("users", _write_users)
+
+
+def save_user(username, password):
+    """Create ``username``; ``False`` if the name is taken or reserved for an
+    admin."""
+    if is_admin(username) or user_exists(username):
+        return False
+    stored = hash_password(password)
+    return writer.submit("users", (username, stored, False)).result()
+
+
+def create_admin(username, password):
+    """Provision the account of a name in ``ADMIN_USERS``; ``False`` if it
+    already exists."""
+    if not is_admin(username):
+        raise ValueError(f"{username!r} is not listed in INTELLIHEALTH_ADMIN_USERS")
+    if user_exists(username):
+        return False
+    stored = hash_password(password)
+    return writer.submit("users", (username, stored, False)).result()
+
+
+def is_admin(username):
+    return username in ADMIN_USERS
+
+
+def verify_user(username, password):
+    return get_user_store().verify(username, password)
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m intellihealth.users",
+        description="Manage IntelliHealth accounts.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    admin = sub.add_parser("create-admin", help="Create the account of an admin user")
+    admin.add_argument("username")
+    args = parser.parse_args(argv)
+
+    try:
+        created = create_admin(args.username, getpass.getpass(f"Password for {args.username}: "))
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    writer.flush()
+    if not created:
+        raise SystemExit(f"{args.username} already exists")
+    print(f"Created admin account {args.username}")
+
+
+if __name__ == "__main__":
+    main()
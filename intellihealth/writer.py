@@ -0,0 +1,179 @@
+"""Write-behind writer shared by every session in the process.
+
+History saves and user signups are queued to one background thread
+instead of being written by the Streamlit rerun that produced them.  The
+thread drains whatever is pending (up to ``INTELLIHEALTH_WRITE_BATCH``
+items), groups it by kind and hands each group to its registered handler,
+which commits the whole group with a single fsync.  Because only this
+thread writes, concurrent sessions can no longer interleave partial rows.
+
+The queue holds at most ``INTELLIHEALTH_WRITE_QUEUE`` items; ``submit``
+blocks when it is full (backpressure) and raises ``TimeoutError`` after
+``INTELLIHEALTH_WRITE_TIMEOUT`` seconds.  Pending writes are flushed at
+interpreter exit, and readers call ``flush()`` to see their own writes.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+from intellihealth import metrics
+
+MAX_QUEUE = int(os.environ.get("INTELLIHEALTH_WRITE_QUEUE", "10000"))
+MAX_BATCH = int(os.environ.get("INTELLIHEALTH_WRITE_BATCH", "512"))
+SUBMIT_TIMEOUT = float(os.environ.get("INTELLIHEALTH_WRITE_TIMEOUT", "10"))
+
+logger = logging.getLogger("intellihealth.writer")
+
+_handlers = {}
+
+
+def register(kind, handler):
+    """``handler(payloads)`` commits a list of payloads and returns a list of
+    results (or ``None``), in order."""
+    _handlers[kind] = handler
+
+
+_FLUSH = object()
+_STOP = object()
+
+
+class WriteBehindWriter:
+    def __init__(self, max_queue=MAX_QUEUE, max_batch=MAX_BATCH):
+        self.max_batch = max_batch
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="write-behind", daemon=True
+                    )
+                    self._thread.start()
+
+    def submit(self, kind, payload):
+        """Queue one write; returns a ``Future`` resolved once it is durable."""
+        if kind not in _handlers:
+            raise ValueError(f"No writer handler registered for {kind!r}")
+        self._ensure_started()
+        future = Future()
+        try:
+            self._queue.put((kind, payload, future), timeout=SUBMIT_TIMEOUT)
+        except queue.Full:
+            raise TimeoutError(
+                f"write queue full ({self._queue.maxsize} pending writes)"
+            ) from None
+        return future
+
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout=None):
+        """Block until everything submitted before this call is committed."""
+        if self._thread is None or not self.pending():
+            return
+        done = Future()
+        self._queue.put((_FLUSH, None, done))
+        done.result(timeout)
+
+    def close(self, timeout=None):
+        if self._thread is None:
+            return
+        self._queue.put((_STOP, None, None))
+        self._thread.join(timeout)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch and batch[-1][0] not in (_FLUSH, _STOP):
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, kind, items):
+        try:
+            with metrics.span("write_batch", kind=kind):
+                results = _handlers[kind]([payload for _, payload, _ in items])
+        except Exception as exc:
+            logger.exception("write-behind batch of %d %s writes failed", len(items), kind)
+            self.errors += len(items)
+            for _, _, future in items:
+                future.set_exception(exc)
+            return
+        if results is None:
+            results = [None] * len(items)
+        for (_, _, future), result in zip(items, results):
+            future.set_result(result)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            groups = {}
+            for item in batch:
+                if item[0] not in (_FLUSH, _STOP):
+                    groups.setdefault(item[0], []).append(item)
+            for kind, items in groups.items():
+                self._commit(kind, items)
+            self.batches += 1
+            self.items += sum(len(items) for items in groups.values())
+
+            stop = False
+            for kind, _, future in batch:
+                if kind is _FLUSH:
+                    future.set_result(None)
+                elif kind is _STOP:
+                    stop = True
+                self._queue.task_done()
+            if stop:
+                return
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = WriteBehindWriter()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def submit(kind, payload):
+    return get_writer().submit(kind, payload)
+
+
+def flush(timeout=None):
+    if _writer is not None:
+        _writer.flush(timeout)
+
+
+def _writer_metrics():
+    if _writer is None:
+        return []
+    return [
+        ("write_queue_depth", "gauge", "Writes waiting for the background writer.",
+         [({}, _writer.pending())]),
+        ("write_batches_total", "counter", "Batches committed by the background writer.",
+         [({}, _writer.batches)]),
+        ("write_items_total", "counter", "Writes committed by the background writer.",
+         [({}, _writer.items)]),
+        ("write_errors_total", "counter", "Writes that failed to commit.",
+         [({}, _writer.errors)]),
+    ]
+
+
+metrics.register_collector(_writer_metrics)
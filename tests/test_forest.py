@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import (
+    ExtraTreesRegressor,
+    GradientBoostingRegressor,
+    RandomForestRegressor,
+)
+
+from intellihealth.forest import CompiledEnsemble, compile_ensemble
+from intellihealth.schema import random_inputs
+
+ESTIMATORS = {
+    "forest": lambda: RandomForestRegressor(n_estimators=8, max_depth=7, random_state=0),
+    "boosting": lambda: GradientBoostingRegressor(
+        loss="huber", n_estimators=15, max_depth=4, random_state=0
+    ),
+    "extra_trees": lambda: ExtraTreesRegressor(n_estimators=8, max_depth=9, random_state=0),
+}
+
+
+@pytest.fixture(scope="module", params=list(ESTIMATORS))
+def fitted(request):
+    X = pd.DataFrame(random_inputs("sleep", 600, seed=1))
+    rng = np.random.default_rng(2)
+    y = X.to_numpy() @ rng.uniform(-1, 1, X.shape[1]) + rng.normal(0, 3, len(X))
+    estimator = ESTIMATORS[request.param]().fit(X, y)
+    test = pd.DataFrame(random_inputs("sleep", 300, seed=3))
+    return estimator, test
+
+
+def _reference(estimator, X, n_trees=None, max_depth=None):
+    """What the estimator predicts with only its first ``n_trees`` trees,
+    each cut at ``max_depth``, computed from scikit-learn's own paths."""
+    if isinstance(estimator, GradientBoostingRegressor):
+        trees = estimator.estimators_[:n_trees, 0]
+        base, scale = estimator.init_.predict(X), estimator.learning_rate
+    else:
+        trees = estimator.estimators_[:n_trees]
+        base, scale = 0.0, 1.0 / len(trees)
+    total = np.zeros(len(X))
+    for tree in trees:
+        paths = tree.decision_path(X.to_numpy(dtype=np.float32))
+        for i in range(len(X)):
+            # Node ids increase with depth along a path.
+            path = np.sort(paths.indices[paths.indptr[i]:paths.indptr[i + 1]])
+            node = path[-1] if max_depth is None else path[min(max_depth, len(path) - 1)]
+            total[i] += tree.tree_.value[node, 0, 0]
+    return base + scale * total
+
+
+def _check_contributions(compiled, X, expected):
+    bias, contributions = compiled.contributions(X)
+    assert contributions.shape == (len(X), compiled.n_features_in_)
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_compiled_matches_estimator(fitted):
+    estimator, X = fitted
+    compiled = compile_ensemble(estimator)
+    expected = estimator.predict(X)
+    np.testing.assert_allclose(compiled.predict(X.to_numpy()), expected, rtol=1e-9, atol=1e-9)
+    _check_contributions(compiled, X.to_numpy(), expected)
+    assert list(compiled.feature_names_in_) == list(X.columns)
+
+
+@pytest.mark.parametrize("n_trees, max_depth", [(3, None), (None, 2), (4, 3)])
+def test_truncated_ensemble(fitted, n_trees, max_depth):
+    estimator, X = fitted
+    compiled = compile_ensemble(estimator, n_trees=n_trees, max_depth=max_depth)
+    expected = _reference(estimator, X, n_trees, max_depth)
+    if n_trees is not None:
+        assert compiled.n_trees == n_trees
+    if max_depth is not None:
+        assert compiled.max_depth == max_depth
+    np.testing.assert_allclose(compiled.predict(X.to_numpy()), expected, rtol=1e-9, atol=1e-9)
+    _check_contributions(compiled, X.to_numpy(), expected)
+
+
+def test_reference_matches_estimator(fitted):
+    estimator, X = fitted
+    np.testing.assert_allclose(_reference(estimator, X), estimator.predict(X), rtol=1e-9)
+
+
+@pytest.mark.parametrize("compress, mmap", [(False, True), (False, False), (True, True)])
+def test_save_load_round_trip(fitted, tmp_path, compress, mmap):
+    estimator, X = fitted
+    compiled = compile_ensemble(estimator, source=(123, 456))
+    path = str(tmp_path / "model.compiled")
+    compiled.save(path, compress=compress)
+    assert (tmp_path / "model.compiled" / "arrays.npz").exists() == compress
+
+    loaded = CompiledEnsemble.load(path, mmap=mmap)
+    assert loaded.source == (123, 456)
+    assert (loaded.n_trees, loaded.n_nodes, loaded.max_depth) == (
+        compiled.n_trees, compiled.n_nodes, compiled.max_depth
+    )
+    assert list(loaded.feature_names_in_) == list(X.columns)
+    if mmap and not compress:
+        assert isinstance(loaded.threshold.base, np.memmap)
+    np.testing.assert_array_equal(loaded.predict(X.to_numpy()), compiled.predict(X.to_numpy()))
@@ -0,0 +1,55 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from intellihealth import history, writer
+
+
+def _page():
+    import streamlit as st
+
+    from intellihealth.ui import history as page
+
+    st.session_state.username = "bob"
+    page.render()
+
+
+@pytest.fixture(params=sorted(history.BACKENDS))
+def history_dir(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("INTELLIHEALTH_HISTORY_BACKEND", request.param)
+    monkeypatch.setattr(history, "_store", None)
+    yield tmp_path
+    writer.flush()
+
+
+def _run():
+    at = AppTest.from_function(_page, default_timeout=30)
+    at.run()
+    assert not at.exception
+    return at
+
+
+def test_trends_without_complete_records(history_dir):
+    nan = float("nan")
+    history.save_history_many([
+        history.make_row("bob", nan, 70.0, 2000.0, timestamp="2025-01-01 08:00"),
+        history.make_row("bob", 40.0, float("inf"), 2100.0, timestamp="2025-01-02 08:00"),
+    ])
+    assert history.rolling_means("bob") == {}
+
+    at = _run()
+    assert "No complete records to average yet." in [c.value for c in at.caption]
+    assert not at.metric
+
+
+def test_trends_show_rolling_means(history_dir):
+    history.save_history_many([
+        history.make_row("bob", 40.0, 70.0, 2000.0, timestamp="2025-01-01 08:00"),
+        history.make_row("bob", 60.0, 80.0, 2400.0, timestamp="2025-01-02 08:00"),
+    ])
+
+    at = _run()
+    assert [m.label for m in at.metric] == [
+        "Stress (7-day avg)", "Sleep (7-day avg)", "Calories (7-day avg)"
+    ]
+    assert at.metric[0].value == "50.0"
@@ -0,0 +1,41 @@
+import pytest
+
+from intellihealth import users, writer
+
+
+@pytest.fixture
+def user_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(users, "ADMIN_USERS", {"admin"})
+    monkeypatch.setattr(users, "_store", None)
+    yield tmp_path
+    writer.flush()
+
+
+def test_signup_refuses_admin_names(user_dir):
+    assert users.save_user("admin", "pw") is False
+    assert users.get_user_store().add_user("admin", "pw") is False
+    assert not users.user_exists("admin")
+    assert not users.verify_user("admin", "pw")
+
+
+def test_create_admin(user_dir):
+    assert users.create_admin("admin", "pw") is True
+    assert users.verify_user("admin", "pw")
+    assert users.is_admin("admin")
+    assert users.create_admin("admin", "other") is False
+
+
+def test_create_admin_requires_listed_name(user_dir):
+    with pytest.raises(ValueError):
+        users.create_admin("mallory", "pw")
+    assert not users.user_exists("mallory")
+
+
+def test_plaintext_passwords_are_hashed_on_open(user_dir):
+    (user_dir / "users.csv").write_text("username,password\nbob,secret\nbob,secret2\n")
+    assert users.verify_user("bob", "secret2")
+    assert not users.verify_user("bob", "secret")
+    content = (user_dir / "users.csv").read_text()
+    assert "secret" not in content
+    assert content.count("bob,") == 1